@@ -0,0 +1,32 @@
+"""users token epoch
+
+Revision ID: 3ee11462b9e8
+Revises: 0f667c549d89
+Create Date: 2026-10-18 18:54:30.718466
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3ee11462b9e8'
+down_revision: Union[str, Sequence[str], None] = '0f667c549d89'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_epoch', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('token_epoch_changed_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_users_token_epoch_changed_at'), 'users', ['token_epoch_changed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_users_token_epoch_changed_at'), table_name='users')
+    op.drop_column('users', 'token_epoch_changed_at')
+    op.drop_column('users', 'token_epoch')
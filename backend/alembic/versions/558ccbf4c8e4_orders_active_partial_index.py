@@ -0,0 +1,34 @@
+"""orders active partial index
+
+Revision ID: 558ccbf4c8e4
+Revises: eb62152d6209
+Create Date: 2026-10-18 16:21:47.530918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '558ccbf4c8e4'
+down_revision: Union[str, Sequence[str], None] = 'eb62152d6209'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_orders_active_status_id',
+        'orders',
+        ['status', 'id'],
+        unique=False,
+        postgresql_where=sa.text("status NOT IN ('delivered', 'cancelled')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_active_status_id', table_name='orders')
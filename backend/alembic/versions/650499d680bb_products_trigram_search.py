@@ -0,0 +1,43 @@
+"""products trigram search
+
+Revision ID: 650499d680bb
+Revises: e5ec92f94aa1
+Create Date: 2026-10-18 11:03:17.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '650499d680bb'
+down_revision: Union[str, Sequence[str], None] = 'e5ec92f94aa1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('products', sa.Column(
+        'search_document',
+        sa.String(),
+        sa.Computed("lower(name || ' ' || coalesce(description, ''))", persisted=True),
+        nullable=True,
+    ))
+    op.create_index(
+        'ix_products_search_document_trgm',
+        'products',
+        ['search_document'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'search_document': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_search_document_trgm', table_name='products')
+    op.drop_column('products', 'search_document')
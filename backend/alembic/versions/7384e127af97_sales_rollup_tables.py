@@ -0,0 +1,66 @@
+"""sales rollup tables
+
+Revision ID: 7384e127af97
+Revises: 7e4d1165bcbc
+Create Date: 2026-10-18 14:48:52.730164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7384e127af97'
+down_revision: Union[str, Sequence[str], None] = '7e4d1165bcbc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sales_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'status')
+    )
+    op.create_table('sales_daily_products',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'product_id')
+    )
+
+    # Заполняем сводки по уже накопленной истории
+    op.execute("""
+        INSERT INTO sales_daily (day, status, order_count, revenue)
+        SELECT t.day, t.status, count(*), sum(t.total)
+        FROM (
+            SELECT o.id,
+                   coalesce(o.status, 'pending') AS status,
+                   (o.created_at AT TIME ZONE 'UTC')::date AS day,
+                   coalesce(sum(i.price * i.quantity), 0) AS total
+            FROM orders o
+            LEFT JOIN order_items i ON i.order_id = o.id
+            GROUP BY o.id
+        ) t
+        GROUP BY t.day, t.status
+    """)
+    op.execute("""
+        INSERT INTO sales_daily_products (day, product_id, quantity, revenue)
+        SELECT (o.created_at AT TIME ZONE 'UTC')::date, i.product_id, sum(i.quantity), sum(i.price * i.quantity)
+        FROM order_items i
+        JOIN orders o ON o.id = i.order_id
+        WHERE o.status IS DISTINCT FROM 'cancelled' AND i.product_id IS NOT NULL
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sales_daily_products')
+    op.drop_table('sales_daily')
@@ -0,0 +1,30 @@
+"""orders created_at
+
+Revision ID: 7e4d1165bcbc
+Revises: 650499d680bb
+Create Date: 2026-10-18 12:26:05.318470
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e4d1165bcbc'
+down_revision: Union[str, Sequence[str], None] = '650499d680bb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.create_index(op.f('ix_orders_created_at'), 'orders', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_orders_created_at'), table_name='orders')
+    op.drop_column('orders', 'created_at')
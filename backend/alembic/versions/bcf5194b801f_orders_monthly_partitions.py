@@ -0,0 +1,176 @@
+"""orders monthly partitions
+
+Revision ID: bcf5194b801f
+Revises: 558ccbf4c8e4
+Create Date: 2026-10-18 17:02:13.877405
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bcf5194b801f'
+down_revision: Union[str, Sequence[str], None] = '558ccbf4c8e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Сколько месяцев вперед создать партиций сразу; дальше их создает приложение при старте
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_month_partitions(first: date, last: date) -> None:
+    month = first
+    while month <= last:
+        upper = _add_months(month, 1)
+        for table in ('orders', 'order_items'):
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+            )
+        month = upper
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Старые таблицы переименовываются, их последовательности id переходят к новым
+    op.execute("ALTER TABLE order_items RENAME TO order_items_legacy")
+    op.execute("ALTER INDEX order_items_pkey RENAME TO order_items_legacy_pkey")
+    op.execute("ALTER TABLE orders RENAME TO orders_legacy")
+    op.execute("ALTER INDEX orders_pkey RENAME TO orders_legacy_pkey")
+    op.execute("DROP INDEX ix_orders_created_at")
+    op.execute("DROP INDEX ix_orders_active_status_id")
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY NONE")
+    op.execute("ALTER SEQUENCE order_items_id_seq OWNED BY NONE")
+
+    # Ключ партиционирования должен входить в первичный ключ, поэтому PK (id, created_at),
+    # а позиции хранят created_at своего заказа для составного внешнего ключа
+    op.execute("""
+        CREATE TABLE orders (
+            id INTEGER NOT NULL DEFAULT nextval('orders_id_seq'),
+            user_id INTEGER,
+            status VARCHAR,
+            delivery_address VARCHAR,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            total_price NUMERIC(12, 2) NOT NULL DEFAULT 0,
+            item_count INTEGER NOT NULL DEFAULT 0,
+            CONSTRAINT orders_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("""
+        CREATE TABLE order_items (
+            id INTEGER NOT NULL DEFAULT nextval('order_items_id_seq'),
+            order_id INTEGER NOT NULL,
+            order_created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            product_id INTEGER,
+            quantity INTEGER,
+            price NUMERIC(10, 2) NOT NULL,
+            CONSTRAINT order_items_pkey PRIMARY KEY (id, order_created_at),
+            CONSTRAINT order_items_order_fkey FOREIGN KEY (order_id, order_created_at)
+                REFERENCES orders (id, created_at)
+        ) PARTITION BY RANGE (order_created_at)
+    """)
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY orders.id")
+    op.execute("ALTER SEQUENCE order_items_id_seq OWNED BY order_items.id")
+
+    # Индексы на родительской таблице создаются и во всех партициях
+    op.create_index('ix_orders_created_at', 'orders', ['created_at'], unique=False)
+    op.create_index('ix_orders_user_id_id', 'orders', ['user_id', 'id'], unique=False)
+    op.create_index(
+        'ix_orders_active_status_id',
+        'orders',
+        ['status', 'id'],
+        unique=False,
+        postgresql_where=sa.text("status NOT IN ('delivered', 'cancelled')"),
+    )
+    op.create_index('ix_order_items_order_id', 'order_items', ['order_id', 'order_created_at'], unique=False)
+
+    conn = op.get_bind()
+    oldest = conn.execute(sa.text("SELECT min(created_at) FROM orders_legacy")).scalar()
+    now = datetime.now(timezone.utc)
+    first = (oldest or now).astimezone(timezone.utc).date().replace(day=1)
+    _create_month_partitions(first, _add_months(now.date().replace(day=1), MONTHS_AHEAD))
+
+    op.execute("""
+        INSERT INTO orders (id, user_id, status, delivery_address, created_at, total_price, item_count)
+        SELECT id, user_id, status, delivery_address, created_at, total_price, item_count
+        FROM orders_legacy
+    """)
+    # Позиции без заказа перенести нельзя: у них нет ключа партиционирования
+    op.execute("""
+        INSERT INTO order_items (id, order_id, order_created_at, product_id, quantity, price)
+        SELECT i.id, i.order_id, o.created_at, i.product_id, i.quantity, i.price
+        FROM order_items_legacy i
+        JOIN orders_legacy o ON o.id = i.order_id
+    """)
+    op.execute("DROP TABLE order_items_legacy")
+    op.execute("DROP TABLE orders_legacy")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE order_items RENAME TO order_items_partitioned")
+    op.execute("ALTER INDEX order_items_pkey RENAME TO order_items_partitioned_pkey")
+    op.execute("DROP INDEX ix_order_items_order_id")
+    op.execute("ALTER TABLE orders RENAME TO orders_partitioned")
+    op.execute("ALTER INDEX orders_pkey RENAME TO orders_partitioned_pkey")
+    op.execute("DROP INDEX ix_orders_created_at")
+    op.execute("DROP INDEX ix_orders_user_id_id")
+    op.execute("DROP INDEX ix_orders_active_status_id")
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY NONE")
+    op.execute("ALTER SEQUENCE order_items_id_seq OWNED BY NONE")
+
+    op.execute("""
+        CREATE TABLE orders (
+            id INTEGER NOT NULL DEFAULT nextval('orders_id_seq'),
+            user_id INTEGER,
+            status VARCHAR,
+            delivery_address VARCHAR,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            total_price NUMERIC(12, 2) NOT NULL DEFAULT 0,
+            item_count INTEGER NOT NULL DEFAULT 0,
+            CONSTRAINT orders_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("""
+        CREATE TABLE order_items (
+            id INTEGER NOT NULL DEFAULT nextval('order_items_id_seq'),
+            order_id INTEGER REFERENCES orders (id),
+            product_id INTEGER,
+            quantity INTEGER,
+            price NUMERIC(10, 2) NOT NULL,
+            CONSTRAINT order_items_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY orders.id")
+    op.execute("ALTER SEQUENCE order_items_id_seq OWNED BY order_items.id")
+    op.create_index('ix_orders_created_at', 'orders', ['created_at'], unique=False)
+    op.create_index(
+        'ix_orders_active_status_id',
+        'orders',
+        ['status', 'id'],
+        unique=False,
+        postgresql_where=sa.text("status NOT IN ('delivered', 'cancelled')"),
+    )
+
+    op.execute("""
+        INSERT INTO orders (id, user_id, status, delivery_address, created_at, total_price, item_count)
+        SELECT id, user_id, status, delivery_address, created_at, total_price, item_count
+        FROM orders_partitioned
+    """)
+    op.execute("""
+        INSERT INTO order_items (id, order_id, product_id, quantity, price)
+        SELECT id, order_id, product_id, quantity, price
+        FROM order_items_partitioned
+    """)
+    # Партиции удаляются вместе с родительскими таблицами
+    op.execute("DROP TABLE order_items_partitioned")
+    op.execute("DROP TABLE orders_partitioned")
@@ -0,0 +1,27 @@
+"""products category index
+
+Revision ID: e5ec92f94aa1
+Revises: 166bab066878
+Create Date: 2026-10-18 10:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5ec92f94aa1'
+down_revision: Union[str, Sequence[str], None] = '166bab066878'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_products_category_id', 'products', ['category', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_category_id', table_name='products')
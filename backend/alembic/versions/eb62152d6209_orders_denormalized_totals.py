@@ -0,0 +1,45 @@
+"""orders denormalized totals
+
+Revision ID: eb62152d6209
+Revises: 7384e127af97
+Create Date: 2026-10-18 15:37:09.114852
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'eb62152d6209'
+down_revision: Union[str, Sequence[str], None] = '7384e127af97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('total_price', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False))
+    op.add_column('orders', sa.Column('item_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Заполняем итоги для существующих заказов
+    op.execute("""
+        UPDATE orders o
+        SET total_price = t.total_price,
+            item_count = t.item_count
+        FROM (
+            SELECT order_id,
+                   sum(price * quantity) AS total_price,
+                   sum(quantity) AS item_count
+            FROM order_items
+            GROUP BY order_id
+        ) t
+        WHERE t.order_id = o.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('orders', 'item_count')
+    op.drop_column('orders', 'total_price')
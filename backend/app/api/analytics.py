@@ -0,0 +1,62 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.infrastructure.database import get_db
+from app.infrastructure.orm.analytics_repository import SqlAnalyticsRepository
+from app.application.analytics.use_cases import GetRevenueByDayUseCase, GetTopProductsUseCase, GetOrderCountsByStatusUseCase
+from app.application.analytics.dto import DailyRevenueOut, ProductSalesOut, StatusCountOut
+from app.api.dependencies import get_current_user
+from app.domain.models.user import User
+
+router = APIRouter()
+
+def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Only admin can view analytics")
+    return current_user
+
+def get_revenue_use_case(db=Depends(get_db)) -> GetRevenueByDayUseCase:
+    return GetRevenueByDayUseCase(SqlAnalyticsRepository(db))
+
+def get_top_products_use_case(db=Depends(get_db)) -> GetTopProductsUseCase:
+    return GetTopProductsUseCase(SqlAnalyticsRepository(db))
+
+def get_status_counts_use_case(db=Depends(get_db)) -> GetOrderCountsByStatusUseCase:
+    return GetOrderCountsByStatusUseCase(SqlAnalyticsRepository(db))
+
+@router.get("/revenue", response_model=list[DailyRevenueOut])
+async def get_revenue(
+    date_from: date | None = None,
+    date_to: date | None = None,
+    uc: GetRevenueByDayUseCase = Depends(get_revenue_use_case),
+    _: User = Depends(require_admin)
+):
+    """
+    Выручка и число заказов по дням (без отмененных заказов).
+    """
+    return await uc.execute(date_from, date_to)
+
+@router.get("/top-products", response_model=list[ProductSalesOut])
+async def get_top_products(
+    limit: int = Query(10, ge=1, le=100),
+    date_from: date | None = None,
+    date_to: date | None = None,
+    uc: GetTopProductsUseCase = Depends(get_top_products_use_case),
+    _: User = Depends(require_admin)
+):
+    """
+    Самые продаваемые товары по количеству за период.
+    """
+    return await uc.execute(limit, date_from, date_to)
+
+@router.get("/status-counts", response_model=list[StatusCountOut])
+async def get_status_counts(
+    date_from: date | None = None,
+    date_to: date | None = None,
+    uc: GetOrderCountsByStatusUseCase = Depends(get_status_counts_use_case),
+    _: User = Depends(require_admin)
+):
+    """
+    Количество заказов по статусам за период.
+    """
+    return await uc.execute(date_from, date_to)
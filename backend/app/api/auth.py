@@ -1,16 +1,21 @@
 from pydantic import BaseModel
 from loguru import logger
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from app.infrastructure.database import get_db
+from app.infrastructure.database import UnitOfWork, after_commit, get_db, get_uow
 from app.infrastructure.orm.user_repository import SqlUserRepository
-from app.application.users.use_cases import LoginUserUseCase
-from app.application.users.dto import UserRegisterIn, UserLoginIn, Token, UserRegisterOut
+from app.infrastructure.orm.refresh_token_repository import SqlRefreshTokenRepository
+from app.infrastructure.orm.email_outbox_repository import SqlEmailOutboxRepository
+from app.application.users.use_cases import LoginUserUseCase, RefreshAccessTokenUseCase, LogoutUserUseCase
+from app.application.users.dto import UserRegisterIn, UserLoginIn, Token, UserRegisterOut, RefreshTokenIn
 from app.domain.models.user import User
-from app.api.dependencies import get_current_user_optional, get_current_user
+from app.api.dependencies import get_current_user_optional, get_current_user, get_current_user_from_db
 from app.core.configs import settings
-from app.core.email import send_verification_email, send_reset_password_email
-from app.infrastructure.security import get_password_hash, verify_password
+from app.core.email import verification_email, reset_password_email
+from app.infrastructure.email_outbox import email_outbox
+from app.infrastructure.security import get_password_hash_async, verify_password_async
+from app.infrastructure.token_epochs import token_epochs
+from app.infrastructure.rate_limit import rate_limiter
 from jose import jwt, JWTError # type: ignore
 
 router = APIRouter()
@@ -27,7 +32,13 @@ class UserResetPasswordIn(BaseModel):
     new_password: str
 
 def get_login_use_case(db=Depends(get_db)) -> LoginUserUseCase:
-    return LoginUserUseCase(SqlUserRepository(db))
+    return LoginUserUseCase(SqlUserRepository(db), SqlRefreshTokenRepository(db))
+
+def get_refresh_use_case(uow: UnitOfWork = Depends(get_uow)) -> RefreshAccessTokenUseCase:
+    return RefreshAccessTokenUseCase(SqlRefreshTokenRepository(uow.session), SqlUserRepository(uow.session), uow)
+
+def get_logout_use_case(db=Depends(get_db)) -> LogoutUserUseCase:
+    return LogoutUserUseCase(SqlRefreshTokenRepository(db))
 
 @router.get("/me")
 async def read_users_me(current_user: User = Depends(get_current_user)):
@@ -58,7 +69,7 @@ async def create_user(
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = get_password_hash(data.password)
+    hashed_password = await get_password_hash_async(data.password)
     user = User(email=data.email, password_hash=hashed_password, role=role)
     created_user = await repo.create(user)
     return UserRegisterOut(id=created_user.id, email=created_user.email)
@@ -73,7 +84,7 @@ async def register(
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = get_password_hash(data.password)
+    hashed_password = await get_password_hash_async(data.password)
     
     # Создаем токен, содержащий все данные для регистрации
     payload = {
@@ -87,11 +98,9 @@ async def register(
     logger.info(f"Email: {data.email}")
     logger.info(f"Password hash: {hashed_password}")
     
-    try:
-        await send_verification_email(data.email, token)
-    except Exception as e:
-        logger.error(f"Failed to send email: {e}")
-        # Игнорируем ошибку отправки в dev-режиме, чтобы не ломать флоу регистрации
+    # Письмо отправит email_outbox после фиксации запроса, SMTP не задерживает ответ
+    await SqlEmailOutboxRepository(db).enqueue(verification_email(data.email, token))
+    after_commit(db, email_outbox.wake)
     
     return {"message": "Verification email sent"}
 
@@ -120,16 +129,21 @@ async def verify_email(token: str, db = Depends(get_db)):
 @router.post("/change-password")
 async def change_password(
     data: UserPasswordUpdate,
-    db = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    uow: UnitOfWork = Depends(get_uow),
+    # Нужен password_hash, которого нет в claims токена
+    current_user: User = Depends(get_current_user_from_db)
 ):
-    if not verify_password(data.old_password, current_user.password_hash):
+    if not await verify_password_async(data.old_password, current_user.password_hash):
         raise HTTPException(status_code=400, detail="Incorrect old password")
     
-    current_user.password_hash = get_password_hash(data.new_password)
+    current_user.password_hash = await get_password_hash_async(data.new_password)
     
-    repo = SqlUserRepository(db)
+    repo = SqlUserRepository(uow.session)
     await repo.update(current_user)
+    # После смены пароля все выданные токены перестают действовать
+    await SqlRefreshTokenRepository(uow.session).revoke_all_for_user(current_user.id)
+    await uow.commit()
+    token_epochs.bump(current_user.id, current_user.token_epoch)
     
     return {"message": "Password updated successfully"}
 
@@ -150,18 +164,15 @@ async def forgot_password(
     }
     token = jwt.encode(payload, settings.jwt_settings.JWT_SECRET_KEY, algorithm=settings.jwt_settings.JWT_ALGORITHM)
     
-    try:
-        await send_reset_password_email(user.email, token)
-    except Exception as e:
-        logger.error(f"Failed to send email: {e}")
-        logger.info(f"Reset token for {user.email}: {token}")
+    await SqlEmailOutboxRepository(db).enqueue(reset_password_email(user.email, token))
+    after_commit(db, email_outbox.wake)
         
     return {"message": "Password reset email sent"}
 
 @router.post("/reset-password")
 async def reset_password(
     data: UserResetPasswordIn,
-    db = Depends(get_db)
+    uow: UnitOfWork = Depends(get_uow)
 ):
     try:
         payload = jwt.decode(data.token, settings.jwt_settings.JWT_SECRET_KEY, algorithms=[settings.jwt_settings.JWT_ALGORITHM])
@@ -171,13 +182,16 @@ async def reset_password(
         if not email or token_type != "reset_password":
              raise HTTPException(status_code=400, detail="Invalid token")
              
-        repo = SqlUserRepository(db)
+        repo = SqlUserRepository(uow.session)
         user = await repo.get_by_email(email)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
             
-        user.password_hash = get_password_hash(data.new_password)
+        user.password_hash = await get_password_hash_async(data.new_password)
         await repo.update(user)
+        await SqlRefreshTokenRepository(uow.session).revoke_all_for_user(user.id)
+        await uow.commit()
+        token_epochs.bump(user.id, user.token_epoch)
         
         return {"message": "Password reset successfully"}
         
@@ -186,6 +200,7 @@ async def reset_password(
 
 @router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     data: UserLoginIn,
     uc: LoginUserUseCase = Depends(get_login_use_case)
 ):
@@ -193,11 +208,15 @@ async def login(
     Аутентификация пользователя (получение токена).
 
     Принимает email и пароль. Возвращает JWT токен доступа (access token).
+    Число попыток ограничено по IP и по email, при превышении - 429 с Retry-After.
     """
+    # Лимит проверяется до use case, чтобы отклоненные попытки не нагружали хеширование
+    await rate_limiter.enforce("login", ip=rate_limiter.client_ip(request), email=data.email)
     return await uc.execute(data)
 
 @router.post("/token", response_model=Token)
 async def login_for_swagger(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     uc: LoginUserUseCase = Depends(get_login_use_case)
 ):
@@ -207,4 +226,29 @@ async def login_for_swagger(
     Использует стандарт OAuth2PasswordRequestForm (form-data) для передачи учетных данных.
     """
     # Swagger отправляет username и password. Мы используем email как username.
-    return await uc.execute(UserLoginIn(email=form_data.username, password=form_data.password))
\ No newline at end of file
+    await rate_limiter.enforce("login", ip=rate_limiter.client_ip(request), email=form_data.username)
+    return await uc.execute(UserLoginIn(email=form_data.username, password=form_data.password))
+
+@router.post("/refresh", response_model=Token)
+async def refresh(
+    data: RefreshTokenIn,
+    uc: RefreshAccessTokenUseCase = Depends(get_refresh_use_case)
+):
+    """
+    Обновление токенов по refresh-токену, без повторного ввода пароля.
+
+    Refresh-токен одноразовый: в ответе приходит новый. Повторное предъявление
+    уже использованного токена отзывает все токены этого входа.
+    """
+    return await uc.execute(data.refresh_token)
+
+@router.post("/logout")
+async def logout(
+    data: RefreshTokenIn,
+    uc: LogoutUserUseCase = Depends(get_logout_use_case)
+):
+    """
+    Выход: отзывает refresh-токен и всю цепочку его ротаций.
+    """
+    await uc.execute(data.refresh_token)
+    return {"message": "Logged out"}
@@ -6,22 +6,20 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.configs import settings
 from app.infrastructure.database import get_db
 from app.infrastructure.orm.user_repository import SqlUserRepository
+from app.infrastructure.token_epochs import token_epochs
 from app.domain.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token", auto_error=False)
 http_bearer = HTTPBearer(auto_error=False)
 
-async def get_current_user(
-    token_bearer: HTTPAuthorizationCredentials | None = Depends(http_bearer),
-    token_oauth: str | None = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+def _decode_token(token_bearer: HTTPAuthorizationCredentials | None, token_oauth: str | None) -> tuple[int, dict]:
     token = None
     if token_bearer:
         token = token_bearer.credentials
@@ -29,7 +27,7 @@ async def get_current_user(
         token = token_oauth
 
     if token is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
     try:
         payload = jwt.decode(
@@ -39,16 +37,60 @@ async def get_current_user(
         )
         user_id: str = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    # Токены без epoch выданы до появления эпох и считаются эпохой 0
+    if token_epochs.is_revoked(int(user_id), payload.get("epoch", 0)):
+        raise _credentials_exception()
+    return int(user_id), payload
 
-    repo = SqlUserRepository(db)
-    user = await repo.get_by_id(int(user_id))
+async def _load_user(user_id: int, db: AsyncSession) -> User:
+    user = await SqlUserRepository(db).get_by_id(user_id)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
+def _ensure_active(user: User) -> User:
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+    return user
+
+async def get_current_user(
+    token_bearer: HTTPAuthorizationCredentials | None = Depends(http_bearer),
+    token_oauth: str | None = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Пользователь из claims access-токена, без запроса к базе.
+
+    В таком User нет password_hash: там, где нужен пароль, используйте
+    get_current_user_from_db. Старые токены без role читают пользователя из базы.
+    """
+    user_id, payload = _decode_token(token_bearer, token_oauth)
+    if "role" not in payload:
+        return _ensure_active(await _load_user(user_id, db))
+
+    return _ensure_active(User(
+        id=user_id,
+        email=payload.get("email", ""),
+        password_hash="",
+        is_active=payload.get("is_active", True),
+        role=payload["role"],
+        is_verified=payload.get("is_verified", False),
+        token_epoch=payload.get("epoch", 0),
+    ))
+
+async def get_current_user_from_db(
+    token_bearer: HTTPAuthorizationCredentials | None = Depends(http_bearer),
+    token_oauth: str | None = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    # Без кэша: смена пароля сверяет старый пароль с актуальным хэшем
+    user_id, _ = _decode_token(token_bearer, token_oauth)
+    return _ensure_active(await _load_user(user_id, db))
+
 async def get_current_user_optional(
     token_oauth: str | None = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
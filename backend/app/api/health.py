@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from fastapi import APIRouter, Depends, HTTPException
+from loguru import logger
+from sqlalchemy import text
+
+from app.api.dependencies import get_current_user
+from app.domain.models.user import User
+from app.infrastructure.database import engine
+from app.infrastructure.pool_metrics import pool_metrics
+
+router = APIRouter()
+
+# Проверка готовности не должна висеть до ALCHEMY_POOL_TIMEOUT, если пул исчерпан
+READY_TIMEOUT_SECONDS = 2.0
+
+
+async def _ping_database() -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+@router.get("/live")
+async def live():
+    """Процесс жив и обслуживает event loop. База не проверяется."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready():
+    """Готовность принимать трафик: соединение из пула и SELECT 1 за READY_TIMEOUT_SECONDS."""
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(_ping_database(), READY_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning(f"Readiness check failed: {e!r}")
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    return {"status": "ok", "database_ms": round((time.perf_counter() - started) * 1000, 3)}
+
+
+@router.get("/metrics")
+async def metrics(current_user: User = Depends(get_current_user)):
+    """
+    Пул соединений этого воркера (у каждого процесса свои счетчики).
+    """
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Only admin can view metrics")
+    return {
+        "pool": pool_metrics.snapshot(engine.sync_engine.pool),
+    }
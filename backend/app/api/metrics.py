@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.infrastructure.database import engine
+from app.infrastructure.http_metrics import http_metrics, render_pool_metrics
+from app.infrastructure.pool_metrics import pool_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    """Метрики этого воркера в текстовом формате Prometheus."""
+    lines = http_metrics.render() + render_pool_metrics(pool_metrics, engine.sync_engine.pool)
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,25 +1,45 @@
-from fastapi import APIRouter, Depends
-from app.infrastructure.database import get_db
+import asyncio
+import json
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from app.infrastructure.database import UnitOfWork, get_db, get_db_context, get_uow
 from app.infrastructure.orm.order_repository import SqlOrderRepository
 from app.infrastructure.orm.pizza_repository import SqlPizzaRepository
-from app.application.orders.use_cases import CreateOrderUseCase, GetOrdersUseCase, UpdateOrderStatusUseCase
-from app.application.orders.dto import CreateOrderIn, OrderOut, OrderStatusUpdateIn, CreateOrderOut
+from app.application.orders.use_cases import CreateOrderUseCase, GetOrdersUseCase, GetActiveOrdersUseCase, UpdateOrderStatusUseCase, ExportOrdersUseCase, BulkUpdateOrderStatusUseCase
+from app.application.orders.dto import CreateOrderIn, OrderOut, OrderStatusUpdateIn, CreateOrderOut, BulkOrderStatusUpdateIn, BulkOrderStatusUpdateOut
 from app.api.dependencies import get_current_user, get_current_user_optional
 from app.domain.models.user import User
+from app.infrastructure.order_events import order_event_hub
+from app.infrastructure.order_intake import order_intake
+from app.infrastructure.active_orders import active_orders
+from app.core.configs import settings
 
 router = APIRouter()
 
-def get_create_order_use_case(db=Depends(get_db)) -> CreateOrderUseCase:
+def get_create_order_use_case(uow: UnitOfWork = Depends(get_uow)) -> CreateOrderUseCase:
     return CreateOrderUseCase(
-        SqlOrderRepository(db),
-        SqlPizzaRepository(db)
+        SqlOrderRepository(uow.session),
+        SqlPizzaRepository(uow.session),
+        uow,
+        order_event_hub,
+        order_intake if settings.order_intake_settings.ORDER_INTAKE_ENABLED else None,
+        active_orders
     )
 
 def get_orders_use_case(db=Depends(get_db)) -> GetOrdersUseCase:
     return GetOrdersUseCase(SqlOrderRepository(db))
 
-def get_update_order_status_use_case(db=Depends(get_db)) -> UpdateOrderStatusUseCase:
-    return UpdateOrderStatusUseCase(SqlOrderRepository(db))
+def get_active_orders_use_case() -> GetActiveOrdersUseCase:
+    return GetActiveOrdersUseCase(active_orders)
+
+def get_update_order_status_use_case(uow: UnitOfWork = Depends(get_uow)) -> UpdateOrderStatusUseCase:
+    return UpdateOrderStatusUseCase(SqlOrderRepository(uow.session), uow, order_event_hub, active_orders)
+
+def get_bulk_update_order_status_use_case(uow: UnitOfWork = Depends(get_uow)) -> BulkUpdateOrderStatusUseCase:
+    return BulkUpdateOrderStatusUseCase(SqlOrderRepository(uow.session), uow, order_event_hub, active_orders)
 
 @router.post("/create", response_model=CreateOrderOut)
 async def create_order(
@@ -38,16 +58,131 @@ async def create_order(
 
 @router.get("/", response_model=list[OrderOut])
 async def get_orders(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    after_id: int | None = None,
+    status: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    include_items: bool = True,
     uc: GetOrdersUseCase = Depends(get_orders_use_case),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Получить список заказов.
+    Получить список заказов (от новых к старым), постранично.
     Сотрудники и админы видят все заказы.
+
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor,
+    его нужно передать в after_id. С include_items=false позиции не загружаются,
+    итоги берутся из сохраненных total_price и item_count.
+    """
+    user_id = None if current_user.role in ['admin', 'employee'] else current_user.id # Fallback for regular users if any
+    orders, next_cursor = await uc.execute(
+        user_id=user_id,
+        limit=limit,
+        after_id=after_id,
+        status=status,
+        created_from=created_from,
+        created_to=created_to,
+        with_items=include_items,
+    )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return orders
+
+@router.get("/active", response_model=list[OrderOut])
+async def get_active_orders(
+    uc: GetActiveOrdersUseCase = Depends(get_active_orders_use_case),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Незавершенные заказы для экрана кухни (от старых к новым), с позициями.
+    Только для сотрудников и админов.
+
+    Отдаются из проекции в памяти, база данных при запросе не читается.
+    """
+    if current_user.role not in ['admin', 'employee']:
+        raise HTTPException(status_code=403, detail="Only staff can view active orders")
+    return await uc.execute()
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+async def _stream_orders_export(fmt: str):
+    # Стрим живет дольше обработчика запроса, поэтому у него своя сессия
+    async with get_db_context() as db:
+        async for chunk in ExportOrdersUseCase(SqlOrderRepository(db)).execute(fmt):
+            yield chunk
+
+@router.get("/export")
+async def export_orders(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Выгрузка всех заказов с позициями в NDJSON или CSV. Только для админов.
+
+    Заказы читаются серверным курсором и отправляются клиенту по мере чтения,
+    поэтому потребление памяти не зависит от объема истории.
+    """
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Only admin can export orders")
+    return StreamingResponse(
+        _stream_orders_export(format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="orders.{format}"'},
+    )
+
+async def _stream_order_events(request: Request, current_user: User):
+    heartbeat = settings.event_settings.ORDER_EVENTS_HEARTBEAT_SECONDS
+    is_staff = current_user.role in ['admin', 'employee']
+    async with order_event_hub.subscription() as queue:
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                # Комментарий SSE не дает прокси закрыть простаивающее соединение
+                yield ": keep-alive\n\n"
+                continue
+            if not is_staff and event.get("user_id") != current_user.id:
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+@router.get("/stream")
+async def stream_order_events(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Поток событий заказов (Server-Sent Events).
+
+    События order_created и order_status_changed содержат order_id, user_id и
+    новый статус; состав заказа клиент дочитывает через GET /orders/.
+    Сотрудники и админы получают все события, остальные - только по своим заказам.
     """
-    if current_user.role in ['admin', 'employee']:
-        return await uc.execute(user_id=None)
-    return await uc.execute(user_id=current_user.id) # Fallback for regular users if any
+    return StreamingResponse(
+        _stream_order_events(request, current_user),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.patch("/status", response_model=BulkOrderStatusUpdateOut)
+async def bulk_update_order_status(
+    data: BulkOrderStatusUpdateIn,
+    uc: BulkUpdateOrderStatusUseCase = Depends(get_bulk_update_order_status_use_case),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Массово изменить статус заказов одним запросом. Только для админов.
+
+    Заказы выбираются по списку order_ids и/или по текущему статусу from_status.
+    Возвращает id измененных заказов и id из списка, которые не подошли под условие.
+    """
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Only admin can update status")
+    return await uc.execute(status=data.status, order_ids=data.order_ids, from_status=data.from_status)
 
 @router.patch("/{order_id}/status", response_model=OrderOut)
 async def update_order_status(
@@ -1,41 +1,48 @@
 from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel
-from app.infrastructure.database import get_db
+from app.infrastructure.database import UnitOfWork, get_db, get_uow
 from app.infrastructure.orm.pizza_repository import SqlPizzaRepository
 from app.application.pizzas.use_cases import GetPizzasUseCase, CreatePizzaUseCase, SearchPizzasUseCase, UpdatePizzaUseCase, DeletePizzaUseCase
 from app.application.pizzas.dto import PizzaOut, CreatePizzaIn, UpdatePizzaIn
+from app.infrastructure.menu_cache import menu_cache
 
 router = APIRouter()
 
 
 
 def get_pizzas_use_case(db=Depends(get_db)) -> GetPizzasUseCase:
-    return GetPizzasUseCase(SqlPizzaRepository(db))
+    return GetPizzasUseCase(SqlPizzaRepository(db), menu_cache)
 
-def get_create_pizza_use_case(db=Depends(get_db)) -> CreatePizzaUseCase:
-    return CreatePizzaUseCase(SqlPizzaRepository(db))
+def get_create_pizza_use_case(uow: UnitOfWork = Depends(get_uow)) -> CreatePizzaUseCase:
+    return CreatePizzaUseCase(SqlPizzaRepository(uow.session), uow, menu_cache)
 
 def get_search_pizzas_use_case(db=Depends(get_db)) -> SearchPizzasUseCase:
     return SearchPizzasUseCase(SqlPizzaRepository(db))
 
-def get_update_pizza_use_case(db=Depends(get_db)) -> UpdatePizzaUseCase:
-    return UpdatePizzaUseCase(SqlPizzaRepository(db))
+def get_update_pizza_use_case(uow: UnitOfWork = Depends(get_uow)) -> UpdatePizzaUseCase:
+    return UpdatePizzaUseCase(SqlPizzaRepository(uow.session), uow, menu_cache)
 
-def get_delete_pizza_use_case(db=Depends(get_db)) -> DeletePizzaUseCase:
-    return DeletePizzaUseCase(SqlPizzaRepository(db))
+def get_delete_pizza_use_case(uow: UnitOfWork = Depends(get_uow)) -> DeletePizzaUseCase:
+    return DeletePizzaUseCase(SqlPizzaRepository(uow.session), uow, menu_cache)
 
 @router.get("/", response_model=list[PizzaOut])
 async def get_pizzas(
+    response: Response,
     category: str | None = None,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: int | None = None,
     uc: GetPizzasUseCase = Depends(get_pizzas_use_case)
 ):
     """
-    Получить список всех пицц.
+    Получить список продуктов меню.
+
+    Фильтрация по категории и пагинация выполняются в базе данных.
+    Если есть следующая страница, ее курсор возвращается в заголовке X-Next-Cursor.
     """
-    products = await uc.execute()
-    if category:
-        return [p for p in products if p.category == category]
+    products, next_cursor = await uc.execute(category=category, limit=limit, after_id=cursor)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
     return products
 
 @router.post("/", response_model=PizzaOut)
@@ -51,12 +58,15 @@ async def create_pizza(
 @router.get("/search", response_model=list[PizzaOut])
 async def search_pizzas(
     query: str,
+    limit: int = Query(20, ge=1, le=100),
     uc: SearchPizzasUseCase = Depends(get_search_pizzas_use_case)
 ):
     """
-    Поиск пицц по названию.
+    Поиск продуктов по названию и описанию.
+
+    Результаты отсортированы по релевантности, совпадения в названии выше.
     """
-    return await uc.execute(query)
+    return await uc.execute(query, limit)
 
 @router.put("/{pizza_id}", response_model=PizzaOut)
 async def update_pizza(
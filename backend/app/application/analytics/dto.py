@@ -0,0 +1,17 @@
+from datetime import date
+from decimal import Decimal
+from pydantic import BaseModel
+
+class DailyRevenueOut(BaseModel):
+    day: date
+    revenue: Decimal
+    order_count: int
+
+class ProductSalesOut(BaseModel):
+    product_id: int
+    quantity: int
+    revenue: Decimal
+
+class StatusCountOut(BaseModel):
+    status: str
+    order_count: int
@@ -0,0 +1,26 @@
+from datetime import date
+from typing import List
+
+from app.domain.abc_repositories.analytics_repository import IAnalyticsRepository
+from app.domain.models.analytics import DailyRevenue, ProductSales, StatusCount
+
+class GetRevenueByDayUseCase:
+    def __init__(self, repository: IAnalyticsRepository):
+        self.repository = repository
+
+    async def execute(self, date_from: date | None = None, date_to: date | None = None) -> List[DailyRevenue]:
+        return await self.repository.revenue_by_day(date_from, date_to)
+
+class GetTopProductsUseCase:
+    def __init__(self, repository: IAnalyticsRepository):
+        self.repository = repository
+
+    async def execute(self, limit: int = 10, date_from: date | None = None, date_to: date | None = None) -> List[ProductSales]:
+        return await self.repository.top_products(limit, date_from, date_to)
+
+class GetOrderCountsByStatusUseCase:
+    def __init__(self, repository: IAnalyticsRepository):
+        self.repository = repository
+
+    async def execute(self, date_from: date | None = None, date_to: date | None = None) -> List[StatusCount]:
+        return await self.repository.order_counts_by_status(date_from, date_to)
@@ -1,5 +1,6 @@
+from datetime import datetime
 from decimal import Decimal
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class OrderItemIn(BaseModel):
     product_id: int
@@ -15,6 +16,15 @@ class CreateOrderOut(BaseModel):
 class OrderStatusUpdateIn(BaseModel):
     status: str
 
+class BulkOrderStatusUpdateIn(BaseModel):
+    status: str
+    order_ids: list[int] | None = Field(default=None, max_length=1000)
+    from_status: str | None = None
+
+class BulkOrderStatusUpdateOut(BaseModel):
+    updated: list[int]
+    rejected: list[int]
+
 class OrderItemOut(BaseModel):
     product_id: int
     price: Decimal
@@ -22,11 +32,13 @@ class OrderItemOut(BaseModel):
 
 class OrderOut(BaseModel):
     id: int
-    user_id: int
+    user_id: int | None = None
     status: str
     delivery_address: str | None = None
-    items: list[OrderItemOut]
+    created_at: datetime | None = None
+    items: list[OrderItemOut] = []
     total_price: Decimal
+    item_count: int = 0
 
     class Config:
         from_attributes = True
@@ -1,44 +1,237 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from fastapi import HTTPException, status
 from app.domain.models.order import Order
 from app.domain.models.orderItem import OrderItem
+from app.application.orders.dto import BulkOrderStatusUpdateOut
+from app.infrastructure.order_events import OrderEventHub, ORDER_CREATED, ORDER_STATUS_CHANGED
+from app.infrastructure.order_intake import OrderIntakeQueue
+from app.infrastructure.active_orders import ActiveOrdersProjection
+from app.infrastructure.database import UnitOfWork
+
+def order_event(event_type: str, order: Order) -> dict:
+    # Только идентификаторы и статус: NOTIFY ограничен 8000 байт, а заказ с
+    # позициями в него может не влезть. Остальное подписчик дочитывает сам
+    return {
+        "type": event_type,
+        "order_id": order.id,
+        "user_id": order.user_id,
+        "status": order.status,
+    }
 
 class CreateOrderUseCase:
 
-    def __init__(self, order_repo, pizza_repo):
+    def __init__(
+        self,
+        order_repo,
+        pizza_repo,
+        uow: UnitOfWork,
+        events: OrderEventHub | None = None,
+        intake: OrderIntakeQueue | None = None,
+        active_orders: ActiveOrdersProjection | None = None,
+    ):
         self.order_repo = order_repo
         self.pizza_repo = pizza_repo
+        self.uow = uow
+        self.events = events
+        self.intake = intake
+        self.active_orders = active_orders
 
     async def execute(self, user_id: int | None, items, delivery_address: str):
         order = Order(user_id, delivery_address=delivery_address)
 
-        for item in items:
-            product = await self.pizza_repo.get_by_id(item.product_id)
-            order.add_item(
-                OrderItem(
-                    product_id=product.id,
-                    price=product.price,
-                    quantity=item.quantity
-                )
+        # Все товары заказа загружаются одним запросом
+        products = await self.pizza_repo.get_many(item.product_id for item in items)
+        missing = sorted({item.product_id for item in items} - products.keys())
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={"message": "Products not found", "missing_product_ids": missing},
             )
 
-        return await self.order_repo.save(order)
+        try:
+            for item in items:
+                product = products[item.product_id]
+                order.add_item(
+                    OrderItem(
+                        product_id=product.id,
+                        price=product.price,
+                        quantity=item.quantity
+                    )
+                )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+        if self.intake is not None:
+            # Очередь пишет заказ в своей сессии и фиксирует сама. Соединение запроса
+            # (чтение товаров) возвращается в пул до ожидания очереди, иначе каждый
+            # ожидающий POST держал бы соединение простаивающим в транзакции
+            await self.uow.close()
+            order_id = await self.intake.submit(order)
+        else:
+            order_id = await self.order_repo.save(order)
+            # Фиксируем до публикации: подписчики не должны увидеть незаписанный заказ
+            await self.uow.commit()
+        if self.active_orders is not None:
+            self.active_orders.apply(order)
+        if self.events is not None:
+            await self.events.publish(order_event(ORDER_CREATED, order))
+        return order_id
 
 class GetOrdersUseCase:
     def __init__(self, order_repo):
         self.order_repo = order_repo
 
-    async def execute(self, user_id: int = None):
-        if user_id is None:
-            return await self.order_repo.get_all()
-        return await self.order_repo.get_by_user_id(user_id)
+    async def execute(
+        self,
+        user_id: int = None,
+        limit: int = 50,
+        after_id: int | None = None,
+        status: str | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        with_items: bool = True,
+    ):
+        # Запрашиваем на одну запись больше, чтобы понять, есть ли следующая страница
+        orders = await self.order_repo.get_page(
+            limit + 1,
+            after_id=after_id,
+            user_id=user_id,
+            status=status,
+            created_from=created_from,
+            created_to=created_to,
+            with_items=with_items,
+        )
+        next_cursor = orders[limit - 1].id if len(orders) > limit else None
+        return orders[:limit], next_cursor
+
+class ExportOrdersUseCase:
+    CSV_HEADER = ["order_id", "user_id", "status", "delivery_address", "created_at", "product_id", "quantity", "price"]
 
-class UpdateOrderStatusUseCase:
     def __init__(self, order_repo):
         self.order_repo = order_repo
 
+    async def execute(self, fmt: str = "ndjson") -> AsyncIterator[str]:
+        if fmt == "csv":
+            yield self._csv_rows([self.CSV_HEADER])
+        async for order in self.order_repo.stream_all():
+            if fmt == "csv":
+                yield self._csv_rows(self._order_to_csv(order))
+            else:
+                yield json.dumps(self._order_to_dict(order), ensure_ascii=False) + "\n"
+
+    @staticmethod
+    def _order_to_dict(order: Order) -> dict:
+        return {
+            "id": order.id,
+            "user_id": order.user_id,
+            "status": order.status,
+            "delivery_address": order.delivery_address,
+            "created_at": order.created_at.isoformat() if order.created_at else None,
+            "total_price": str(order.total_price),
+            "items": [
+                {"product_id": i.product_id, "price": str(i.price), "quantity": i.quantity}
+                for i in order.items
+            ],
+        }
+
+    @staticmethod
+    def _order_to_csv(order: Order) -> list[list]:
+        head = [
+            order.id,
+            order.user_id,
+            order.status,
+            order.delivery_address,
+            order.created_at.isoformat() if order.created_at else "",
+        ]
+        if not order.items:
+            return [head + ["", "", ""]]
+        return [head + [i.product_id, i.quantity, i.price] for i in order.items]
+
+    @staticmethod
+    def _csv_rows(rows: list[list]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+class GetActiveOrdersUseCase:
+    def __init__(self, active_orders: ActiveOrdersProjection):
+        self.active_orders = active_orders
+
+    async def execute(self) -> list[Order]:
+        return self.active_orders.snapshot()
+
+class UpdateOrderStatusUseCase:
+    def __init__(
+        self,
+        order_repo,
+        uow: UnitOfWork,
+        events: OrderEventHub | None = None,
+        active_orders: ActiveOrdersProjection | None = None,
+    ):
+        self.order_repo = order_repo
+        self.uow = uow
+        self.events = events
+        self.active_orders = active_orders
+
     async def execute(self, order_id: int, status: str):
-        order = await self.order_repo.get_by_id(order_id)
-        if not order:
-            return None
-        order.status = status
-        await self.order_repo.save(order)
+        order = await self.order_repo.update_status(order_id, status)
+        if order is None:
+            raise HTTPException(status_code=404, detail="Order not found")
+        await self.uow.commit()
+        if self.active_orders is not None:
+            self.active_orders.apply(order)
+        if self.events is not None:
+            await self.events.publish(order_event(ORDER_STATUS_CHANGED, order))
         return order
+
+
+class BulkUpdateOrderStatusUseCase:
+    def __init__(
+        self,
+        order_repo,
+        uow: UnitOfWork,
+        events: OrderEventHub | None = None,
+        active_orders: ActiveOrdersProjection | None = None,
+    ):
+        self.order_repo = order_repo
+        self.uow = uow
+        self.events = events
+        self.active_orders = active_orders
+
+    async def execute(
+        self,
+        status: str,
+        order_ids: list[int] | None = None,
+        from_status: str | None = None,
+    ) -> BulkOrderStatusUpdateOut:
+        if order_ids is None and from_status is None:
+            raise HTTPException(
+                status_code=422,
+                detail="Either order_ids or from_status must be provided",
+            )
+        if order_ids is not None and not order_ids:
+            return BulkOrderStatusUpdateOut(updated=[], rejected=[])
+
+        changed = await self.order_repo.update_status_many(status, order_ids=order_ids, from_status=from_status)
+        await self.uow.commit()
+        updated = sorted(order_id for order_id, _ in changed)
+        rejected = sorted(set(order_ids) - set(updated)) if order_ids is not None else []
+
+        if self.active_orders is not None and updated:
+            # Заказы, вернувшиеся из завершенного статуса, дочитываются одним запросом
+            missing = self.active_orders.apply_status(updated, status)
+            if missing:
+                for order in await self.order_repo.get_active(order_ids=missing):
+                    self.active_orders.apply(order)
+
+        if self.events is not None:
+            await self.events.publish_many([
+                {"type": ORDER_STATUS_CHANGED, "order_id": order_id, "user_id": user_id, "status": status}
+                for order_id, user_id in changed
+            ])
+        return BulkOrderStatusUpdateOut(updated=updated, rejected=rejected)
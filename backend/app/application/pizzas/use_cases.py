@@ -5,17 +5,33 @@ from app.domain.models.pizza import Pizza
 from app.domain.abc_repositories.pizza_repository import IPizzaRepository
 from app.application.pizzas.dto import CreatePizzaIn, UpdatePizzaIn
 from app.infrastructure.orm.pizza_repository import SqlPizzaRepository
+from app.infrastructure.menu_cache import MenuCache
+from app.infrastructure.database import UnitOfWork
 
 class GetPizzasUseCase:
-    def __init__(self, repository: IPizzaRepository):
+    def __init__(self, repository: IPizzaRepository, menu_cache: MenuCache | None = None):
         self.repository = repository
+        self.menu_cache = menu_cache
 
-    async def execute(self) -> List[Pizza]:
-        return await self.repository.get_all()
+    async def execute(
+        self,
+        category: str | None = None,
+        limit: int = 100,
+        after_id: int | None = None,
+    ) -> tuple[List[Pizza], int | None]:
+        # Запрашиваем на одну запись больше, чтобы понять, есть ли следующая страница
+        if self.menu_cache is not None:
+            page = await self.menu_cache.get(category, limit + 1, after_id)
+        else:
+            page = await self.repository.get_page(category, limit + 1, after_id)
+        next_cursor = page[limit - 1].id if len(page) > limit else None
+        return page[:limit], next_cursor
 
 class CreatePizzaUseCase:
-    def __init__(self, repository: IPizzaRepository):
+    def __init__(self, repository: IPizzaRepository, uow: UnitOfWork, menu_cache: MenuCache | None = None):
         self.repository = repository
+        self.uow = uow
+        self.menu_cache = menu_cache
 
     async def execute(self, data: CreatePizzaIn) -> Pizza:
         pizza = Pizza(
@@ -26,19 +42,28 @@ class CreatePizzaUseCase:
             category=data.category,
             image_url=data.image_url
         )
-        return await self.repository.add(pizza)
+        created = await self.repository.add(pizza)
+        # Кэш сбрасывается после фиксации, иначе перезагрузка прочитает старое меню
+        await self.uow.commit()
+        if self.menu_cache is not None:
+            self.menu_cache.invalidate()
+        return created
 
 class SearchPizzasUseCase:
     def __init__(self, repository: IPizzaRepository):
         self.repository = repository
 
-    async def execute(self, query: str) -> List[Pizza]:
-        return await self.repository.search(query)
+    async def execute(self, query: str, limit: int = 20) -> List[Pizza]:
+        if not query.strip():
+            return []
+        return await self.repository.search(query, limit)
 
 
 class UpdatePizzaUseCase:
-    def __init__(self, repository: SqlPizzaRepository):
+    def __init__(self, repository: SqlPizzaRepository, uow: UnitOfWork, menu_cache: MenuCache | None = None):
         self.repository = repository
+        self.uow = uow
+        self.menu_cache = menu_cache
 
     async def execute(self, pizza_id: int, data: UpdatePizzaIn):
         pizza = await self.repository.get_by_id(pizza_id)
@@ -51,14 +76,25 @@ class UpdatePizzaUseCase:
         if data.category is not None: pizza.category = data.category
         if data.image_url is not None: pizza.image_url = data.image_url
             
-        return await self.repository.update(pizza)
+        updated = await self.repository.update(pizza)
+        # Кэш сбрасывается после фиксации, иначе перезагрузка прочитает старое меню
+        await self.uow.commit()
+        if self.menu_cache is not None:
+            self.menu_cache.invalidate()
+        return updated
 
 class DeletePizzaUseCase:
-    def __init__(self, repository: SqlPizzaRepository):
+    def __init__(self, repository: SqlPizzaRepository, uow: UnitOfWork, menu_cache: MenuCache | None = None):
         self.repository = repository
+        self.uow = uow
+        self.menu_cache = menu_cache
 
     async def execute(self, pizza_id: int):
         success = await self.repository.delete(pizza_id)
         if not success:
             raise HTTPException(status_code=404, detail="Pizza not found")
+        # Кэш сбрасывается после фиксации, иначе перезагрузка прочитает старое меню
+        await self.uow.commit()
+        if self.menu_cache is not None:
+            self.menu_cache.invalidate()
         return {"message": "Pizza deleted successfully"}
\ No newline at end of file
@@ -11,6 +11,10 @@ class UserLoginIn(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: str | None = None
+
+class RefreshTokenIn(BaseModel):
+    refresh_token: str
 
 class UserRegisterOut(BaseModel):
     id: int
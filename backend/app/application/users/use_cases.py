@@ -1,8 +1,17 @@
 from fastapi import HTTPException, status
 from app.domain.abc_repositories.user_repository import IUserRepository
+from app.domain.abc_repositories.refresh_token_repository import IRefreshTokenRepository
 from app.domain.models.user import User
-from app.infrastructure.security import get_password_hash, verify_password, create_access_token
+from app.infrastructure.security import (
+    get_password_hash_async,
+    verify_password_async,
+    create_user_access_token,
+    create_refresh_token,
+    hash_refresh_token,
+    new_token_family,
+)
 from app.application.users.dto import UserRegisterIn, UserLoginIn, Token
+from app.infrastructure.database import UnitOfWork
 
 class RegisterUserUseCase:
     def __init__(self, repository: IUserRepository):
@@ -16,23 +25,68 @@ class RegisterUserUseCase:
                 detail="Email already registered"
             )
         
-        hashed_password = get_password_hash(data.password)
+        hashed_password = await get_password_hash_async(data.password)
         new_user = User(email=data.email, password_hash=hashed_password)
         await self.repository.create(new_user)
         return {"message": "User registered successfully"}
 
 class LoginUserUseCase:
-    def __init__(self, repository: IUserRepository):
+    def __init__(self, repository: IUserRepository, refresh_tokens: IRefreshTokenRepository | None = None):
         self.repository = repository
+        self.refresh_tokens = refresh_tokens
 
     async def execute(self, data: UserLoginIn) -> Token:
         user = await self.repository.get_by_email(data.email)
-        if not user or not verify_password(data.password, user.password_hash):
+        if not user or not await verify_password_async(data.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        access_token = create_access_token(subject=user.id)
-        return Token(access_token=access_token, token_type="bearer")
\ No newline at end of file
+        if not user.is_active:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+
+        access_token = create_user_access_token(user)
+        if self.refresh_tokens is None:
+            return Token(access_token=access_token, token_type="bearer")
+
+        # Новый вход начинает новую цепочку ротаций
+        refresh_token, token_hash, expires_at = create_refresh_token()
+        await self.refresh_tokens.create(user.id, token_hash, new_token_family(), expires_at)
+        return Token(access_token=access_token, token_type="bearer", refresh_token=refresh_token)
+
+class RefreshAccessTokenUseCase:
+    """Обмен refresh-токена на новую пару токенов без проверки пароля."""
+
+    def __init__(self, refresh_tokens: IRefreshTokenRepository, users: IUserRepository, uow: UnitOfWork):
+        self.refresh_tokens = refresh_tokens
+        self.users = users
+        self.uow = uow
+
+    async def execute(self, refresh_token: str) -> Token:
+        new_refresh_token, new_hash, expires_at = create_refresh_token()
+        rotated = await self.refresh_tokens.rotate(hash_refresh_token(refresh_token), new_hash, expires_at)
+        # Пользователь читается по первичному ключу: claims нового токена должны быть актуальными
+        user = await self.users.get_by_id(rotated.user_id) if rotated is not None else None
+        if user is None or not user.is_active:
+            # Отзыв цепочки при повторном использовании токена фиксируется и при ответе 401
+            await self.uow.commit()
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired refresh token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return Token(
+            access_token=create_user_access_token(user),
+            token_type="bearer",
+            refresh_token=new_refresh_token,
+        )
+
+class LogoutUserUseCase:
+    def __init__(self, refresh_tokens: IRefreshTokenRepository):
+        self.refresh_tokens = refresh_tokens
+
+    async def execute(self, refresh_token: str) -> None:
+        # Отзывается вся цепочка: старые токены этого входа тоже перестают работать
+        await self.refresh_tokens.revoke_family(hash_refresh_token(refresh_token))
\ No newline at end of file
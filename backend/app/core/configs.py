@@ -38,12 +38,92 @@ class SQLAlchemySettings(BaseSettings):
     ALCHEMY_MAX_OVERFLOW: int = 50
     ALCHEMY_POOL_TIMEOUT: int = 10
     ALCHEMY_POOL_RECYCLE: int = 3600
+    # Запросы дольше порога пишутся в лог, 0 - не писать
+    ALCHEMY_SLOW_QUERY_MS: float = 200.0
+    # Сколько одинаковых запросов за HTTP-запрос считать подозрением на N+1, 0 - не проверять
+    ALCHEMY_QUERY_REPEAT_THRESHOLD: int = 5
+    # X-DB-Query-Count / X-DB-Query-Time-Ms в ответах, только для отладки
+    ALCHEMY_QUERY_HEADERS: bool = False
 
 
 class JWTSettings(BaseSettings):
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Как часто воркер перечитывает отозванные эпохи токенов
+    JWT_EPOCH_REFRESH_SECONDS: float = 10.0
+
+
+class PasswordHashSettings(BaseSettings):
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # thread | process | inline
+    PASSWORD_HASH_WORKERS: int = 4
+
+
+class CacheSettings(BaseSettings):
+    MENU_CACHE_TTL_SECONDS: float = 60.0
+    MENU_CACHE_MAX_ENTRIES: int = 256
+
+
+class EventSettings(BaseSettings):
+    ORDER_EVENTS_BACKEND: str = "memory"  # memory | postgres
+    ORDER_EVENTS_CHANNEL: str = "order_events"
+    ORDER_EVENTS_QUEUE_SIZE: int = 100
+    ORDER_EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    ORDER_EVENTS_LISTEN_PING_SECONDS: float = 30.0  # проверка соединения LISTEN
+    ORDER_EVENTS_RECONNECT_MAX_SECONDS: float = 30.0
+    ACTIVE_ORDERS_REFRESH_SECONDS: float = 30.0  # 0 - только загрузка при старте
+
+
+class OrderIntakeSettings(BaseSettings):
+    ORDER_INTAKE_ENABLED: bool = False
+    ORDER_INTAKE_MAX_BATCH: int = 50
+    ORDER_INTAKE_MAX_DELAY_MS: int = 10
+    ORDER_INTAKE_QUEUE_SIZE: int = 1000
+
+
+class OrderStorageSettings(BaseSettings):
+    # Списки заказов сначала читают только партиции за последние N дней
+    ORDERS_HOT_WINDOW_DAYS: int = 90
+    ORDERS_PARTITIONS_AHEAD: int = 3
+    ORDERS_ARCHIVE_BATCH_SIZE: int = 5000
+
+
+class RateLimitSettings(BaseSettings):
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # memory | redis
+    # Доверять X-Forwarded-For только за своим прокси
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+    # Маршрут -> ключ -> "число/период"; в .env задается JSON
+    RATE_LIMIT_RULES: dict[str, dict[str, str]] = {
+        "login": {"ip": "20/minute", "email": "5/minute"},
+    }
+
+
+class EmailSettings(BaseSettings):
+    # Gmail: MAIL_USERNAME - адрес, MAIL_PASSWORD - пароль приложения (не от аккаунта!).
+    # Только из окружения; пустые - SMTP без авторизации (локальный relay, тесты)
+    MAIL_USERNAME: str = ""
+    MAIL_PASSWORD: SecretStr = SecretStr("")
+    MAIL_FROM: str = "no-reply@pizza-delivery.com"
+    MAIL_SERVER: str = "smtp.gmail.com"
+    MAIL_PORT: int = 587
+    MAIL_STARTTLS: bool = True
+    MAIL_SSL_TLS: bool = False
+    MAIL_VALIDATE_CERTS: bool = True
+    MAIL_TIMEOUT_SECONDS: float = 30.0
+    # Соединение закрывается, если писем не было дольше этого времени
+    MAIL_IDLE_SECONDS: float = 60.0
+    EMAIL_OUTBOX_ENABLED: bool = True
+    EMAIL_OUTBOX_BATCH_SIZE: int = 20
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5.0
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_BACKOFF_SECONDS: float = 10.0
+    EMAIL_OUTBOX_BACKOFF_MAX_SECONDS: float = 3600.0
+
+
+class MetricsSettings(BaseSettings):
+    # Middleware метрик запросов и GET /metrics для Prometheus
+    METRICS_ENABLED: bool = True
 
 
 class RedisSettings(BaseSettings):
@@ -56,6 +136,14 @@ class Settings(BaseSettings):
     redis_settings: RedisSettings = RedisSettings()  # type: ignore[call-arg]
     sql_alchemy_settings: SQLAlchemySettings = SQLAlchemySettings()  # type: ignore[call-arg]
     jwt_settings: JWTSettings = JWTSettings()  # type: ignore[call-arg]
+    password_hash_settings: PasswordHashSettings = PasswordHashSettings()  # type: ignore[call-arg]
+    cache_settings: CacheSettings = CacheSettings()  # type: ignore[call-arg]
+    event_settings: EventSettings = EventSettings()  # type: ignore[call-arg]
+    order_intake_settings: OrderIntakeSettings = OrderIntakeSettings()  # type: ignore[call-arg]
+    order_storage_settings: OrderStorageSettings = OrderStorageSettings()  # type: ignore[call-arg]
+    rate_limit_settings: RateLimitSettings = RateLimitSettings()  # type: ignore[call-arg]
+    email_settings: EmailSettings = EmailSettings()  # type: ignore[call-arg]
+    metrics_settings: MetricsSettings = MetricsSettings()  # type: ignore[call-arg]
 
 
 settings = Settings()
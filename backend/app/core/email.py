@@ -1,28 +1,14 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
 from pydantic import EmailStr
-import os
-
-# Настройки для Gmail (бесплатно)
-# MAIL_USERNAME - ваш gmail
-# MAIL_PASSWORD - пароль приложения (не от аккаунта!)
-# MAIL_FROM - то, что увидит пользователь (например, no-reply@pizza-delivery.com)
-
-conf = ConnectionConfig(
-    MAIL_USERNAME = os.getenv("MAIL_USERNAME", "akyl.cher@gmail.com"),
-    MAIL_PASSWORD = os.getenv("MAIL_PASSWORD", "xcai gyjw chym covt"),
-    MAIL_FROM = os.getenv("MAIL_FROM", "no-reply@pizza-delivery.com"),
-    MAIL_PORT = 587,
-    MAIL_SERVER = "smtp.gmail.com",
-    MAIL_STARTTLS = True,
-    MAIL_SSL_TLS = False,
-    USE_CREDENTIALS = True,
-    VALIDATE_CERTS = True
-)
-
-async def send_verification_email(email: EmailStr, token: str):
+
+from app.domain.models.outbox_email import OutboxEmail
+
+# Письма не отправляются из запроса: маршруты ставят их в email_outbox,
+# отправляет фоновый воркер (app.infrastructure.email_outbox)
+
+def verification_email(email: EmailStr, token: str) -> OutboxEmail:
     # Ссылка ведет на фронтенд
     verify_url = f"http://localhost:5173/verify-email?token={token}"
-    
+
     html = f"""
     <h3>Подтвердите свой Email</h3>
     <p>Спасибо за регистрацию! Пожалуйста, нажмите на кнопку ниже для активации аккаунта:</p>
@@ -30,19 +16,15 @@ async def send_verification_email(email: EmailStr, token: str):
     <p>Если вы не регистрировались, просто проигнорируйте это письмо.</p>
     """
 
-    message = MessageSchema(
+    return OutboxEmail(
+        recipient=email,
         subject="Подтверждение регистрации Pizza Delivery",
-        recipients=[email],
         body=html,
-        subtype=MessageType.html
     )
 
-    fm = FastMail(conf)
-    await fm.send_message(message)
-
-async def send_reset_password_email(email: EmailStr, token: str):
+def reset_password_email(email: EmailStr, token: str) -> OutboxEmail:
     reset_url = f"http://localhost:5173/reset-password?token={token}"
-    
+
     html = f"""
     <h3>Сброс пароля</h3>
     <p>Вы запросили сброс пароля. Нажмите на кнопку ниже, чтобы задать новый пароль:</p>
@@ -50,12 +32,8 @@ async def send_reset_password_email(email: EmailStr, token: str):
     <p>Если вы не запрашивали сброс пароля, просто проигнорируйте это письмо.</p>
     """
 
-    message = MessageSchema(
+    return OutboxEmail(
+        recipient=email,
         subject="Сброс пароля Pizza Delivery",
-        recipients=[email],
         body=html,
-        subtype=MessageType.html
     )
-
-    fm = FastMail(conf)
-    await fm.send_message(message)
\ No newline at end of file
@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import List
+from app.domain.models.analytics import DailyRevenue, ProductSales, StatusCount
+
+class IAnalyticsRepository(ABC):
+    @abstractmethod
+    async def revenue_by_day(self, date_from: date | None = None, date_to: date | None = None) -> List[DailyRevenue]:
+        pass
+
+    @abstractmethod
+    async def top_products(self, limit: int, date_from: date | None = None, date_to: date | None = None) -> List[ProductSales]:
+        pass
+
+    @abstractmethod
+    async def order_counts_by_status(self, date_from: date | None = None, date_to: date | None = None) -> List[StatusCount]:
+        pass
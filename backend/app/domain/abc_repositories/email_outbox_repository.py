@@ -0,0 +1,24 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from app.domain.models.outbox_email import OutboxEmail
+
+class IEmailOutboxRepository(ABC):
+    @abstractmethod
+    async def enqueue(self, email: OutboxEmail) -> OutboxEmail:
+        pass
+
+    @abstractmethod
+    async def claim_due(self, limit: int, now: datetime, lease_until: datetime) -> list[OutboxEmail]:
+        pass
+
+    @abstractmethod
+    async def mark_sent(self, email_id: int) -> None:
+        pass
+
+    @abstractmethod
+    async def reschedule(self, email_id: int, error: str, next_attempt_at: datetime) -> None:
+        pass
+
+    @abstractmethod
+    async def mark_failed(self, email_id: int, error: str) -> None:
+        pass
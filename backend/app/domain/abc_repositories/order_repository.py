@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from datetime import datetime
 
 class OrderRepository(ABC):
 
@@ -6,10 +8,42 @@ class OrderRepository(ABC):
     async def save(self, order): ...
 
     @abstractmethod
-    async def get_by_user_id(self, user_id: int): ...
+    async def save_many(self, orders: list) -> list[int]: ...
+
+    @abstractmethod
+    async def get_by_user_id(self, user_id: int, created_from: datetime | None = None): ...
 
     @abstractmethod
     async def get_by_id(self, order_id: int): ...
 
     @abstractmethod
     async def get_all(self): ...
+
+    @abstractmethod
+    async def update_status(self, order_id: int, status: str, with_items: bool = True): ...
+
+    @abstractmethod
+    async def update_status_many(
+        self,
+        status: str,
+        order_ids: list[int] | None = None,
+        from_status: str | None = None,
+    ) -> list[tuple[int, int | None]]: ...
+
+    @abstractmethod
+    async def get_page(
+        self,
+        limit: int,
+        after_id: int | None = None,
+        user_id: int | None = None,
+        status: str | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        with_items: bool = True,
+    ): ...
+
+    @abstractmethod
+    async def get_active(self, order_ids: list[int] | None = None): ...
+
+    @abstractmethod
+    def stream_all(self, batch_size: int = 500) -> AsyncIterator: ...
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterable, List
 from app.domain.models.pizza import Pizza
 
 class IPizzaRepository(ABC):
@@ -7,14 +7,22 @@ class IPizzaRepository(ABC):
     async def get_all(self) -> List[Pizza]:
         pass
     
+    @abstractmethod
+    async def get_page(self, category: str | None, limit: int, after_id: int | None = None) -> List[Pizza]:
+        pass
+
     @abstractmethod
     async def get_by_id(self, pizza_id: int) -> Pizza | None:
         pass
 
+    @abstractmethod
+    async def get_many(self, pizza_ids: Iterable[int]) -> dict[int, Pizza]:
+        pass
+
     @abstractmethod
     async def add(self, pizza: Pizza) -> Pizza:
         pass
 
     @abstractmethod
-    async def search(self, query: str) -> List[Pizza]:
+    async def search(self, query: str, limit: int = 20) -> List[Pizza]:
         pass
@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from app.domain.models.refresh_token import RefreshToken
+
+class IRefreshTokenRepository(ABC):
+    @abstractmethod
+    async def create(self, user_id: int, token_hash: str, family_id: str, expires_at: datetime) -> RefreshToken:
+        pass
+
+    @abstractmethod
+    async def rotate(self, token_hash: str, new_token_hash: str, expires_at: datetime) -> RefreshToken | None:
+        pass
+
+    @abstractmethod
+    async def revoke_family(self, token_hash: str) -> None:
+        pass
+
+    @abstractmethod
+    async def revoke_all_for_user(self, user_id: int) -> None:
+        pass
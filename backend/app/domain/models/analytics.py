@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+@dataclass
+class DailyRevenue:
+    day: date
+    revenue: Decimal
+    order_count: int
+
+@dataclass
+class ProductSales:
+    product_id: int
+    quantity: int
+    revenue: Decimal
+
+@dataclass
+class StatusCount:
+    status: str
+    order_count: int
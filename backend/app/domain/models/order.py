@@ -1,16 +1,39 @@
+from datetime import datetime
+from decimal import Decimal
+
+# Заказы в этих статусах больше не меняются и не нужны кухне
+TERMINAL_STATUSES = ("delivered", "cancelled")
+
+
 class Order:
-    def __init__(self, user_id: int | None, id: int = None, status: str = "pending", delivery_address: str = None):
+    def __init__(
+        self,
+        user_id: int | None,
+        id: int = None,
+        status: str = "pending",
+        delivery_address: str = None,
+        created_at: datetime | None = None,
+        total_price: Decimal | None = None,
+        item_count: int | None = None,
+    ):
         self.id = id
         self.user_id = user_id
         self.status = status
         self.delivery_address = delivery_address
+        self.created_at = created_at
         self.items: list = []
+        # Итоги хранятся в заказе и пересчитываются при добавлении позиций,
+        # поэтому для сводных списков позиции можно не загружать
+        self.total_price = total_price if total_price is not None else Decimal(0)
+        self.item_count = item_count if item_count is not None else 0
 
     def add_item(self, item):
         if item.quantity <= 0:
             raise ValueError("Quantity must be positive")
         self.items.append(item)
+        self.total_price += item.price * item.quantity
+        self.item_count += item.quantity
 
     @property
-    def total_price(self):
-        return sum(i.price * i.quantity for i in self.items)
+    def is_active(self) -> bool:
+        return self.status not in TERMINAL_STATUSES
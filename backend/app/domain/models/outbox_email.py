@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+@dataclass
+class OutboxEmail:
+    recipient: str
+    subject: str
+    body: str
+    id: int | None = None
+    attempts: int = 0
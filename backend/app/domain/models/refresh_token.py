@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+@dataclass
+class RefreshToken:
+    user_id: int
+    family_id: str
+    expires_at: datetime
+    id: int | None = None
+    revoked_at: datetime | None = None
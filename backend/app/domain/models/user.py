@@ -7,4 +7,6 @@ class User:
     id: int | None = None
     is_active: bool = True
     role: str = "employee"
-    is_verified: bool = False
\ No newline at end of file
+    is_verified: bool = False
+    # Увеличивается при смене пароля, роли или активности: выданные раньше access-токены отзываются
+    token_epoch: int = 0
@@ -0,0 +1,105 @@
+import asyncio
+
+from loguru import logger
+
+from app.core.configs import settings
+from app.domain.models.order import Order, TERMINAL_STATUSES
+from app.infrastructure.database import get_db_context
+from app.infrastructure.orm.order_repository import SqlOrderRepository
+
+
+class ActiveOrdersProjection:
+    """
+    Незавершенные заказы (экран кухни) в памяти процесса.
+
+    При старте проекция загружается из базы по частичному индексу, дальше ее
+    обновляют use case-ы создания и смены статуса. Заказы в статусах delivered
+    и cancelled из нее удаляются, поэтому размер не зависит от истории.
+    Если воркеров несколько, каждый видит только свои изменения; refresh_interval
+    ограничивает, насколько проекция может отстать от базы.
+    """
+
+    def __init__(self, refresh_interval: float = 0):
+        self.refresh_interval = refresh_interval
+        self._orders: dict[int, Order] = {}
+        self._refresher: asyncio.Task | None = None
+        # Изменения, пришедшие во время чтения из базы; None - перестройки нет
+        self._pending: list[tuple] | None = None
+        self._rebuild_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        await self.rebuild()
+        if self.refresh_interval > 0 and self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+
+    async def rebuild(self) -> None:
+        async with self._rebuild_lock:
+            self._pending = []
+            try:
+                async with get_db_context() as db:
+                    orders = await SqlOrderRepository(db).get_active()
+                pending = self._pending
+            finally:
+                self._pending = None
+            self._orders = {order.id: order for order in orders}
+            # Выборка могла быть сделана до этих изменений: без повтора они бы потерялись
+            for change in pending:
+                if change[0] == "order":
+                    self.apply(change[1])
+                else:
+                    self.apply_status(change[1], change[2])
+        logger.info(f"Active orders projection loaded: {len(self._orders)} order(s)")
+
+    def snapshot(self) -> list[Order]:
+        return sorted(self._orders.values(), key=lambda order: order.id)
+
+    def apply(self, order: Order) -> None:
+        if self._pending is not None:
+            self._pending.append(("order", order))
+        if order.is_active:
+            self._orders[order.id] = order
+        else:
+            self._orders.pop(order.id, None)
+
+    def apply_status(self, order_ids: list[int], status: str) -> list[int]:
+        """
+        Меняет статус известных заказов. Возвращает id, которых нет в проекции,
+        но которые по новому статусу должны в ней быть: их нужно дочитать из базы.
+        """
+        if self._pending is not None:
+            self._pending.append(("status", list(order_ids), status))
+        missing = []
+        for order_id in order_ids:
+            order = self._orders.get(order_id)
+            if order is None:
+                if status not in TERMINAL_STATUSES:
+                    missing.append(order_id)
+                continue
+            order.status = status
+            if not order.is_active:
+                del self._orders[order_id]
+        return missing
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.error(f"Failed to refresh active orders projection: {e}")
+
+
+active_orders = ActiveOrdersProjection(
+    refresh_interval=settings.event_settings.ACTIVE_ORDERS_REFRESH_SECONDS,
+)
+
+
+__all__ = [
+        'ActiveOrdersProjection',
+        'active_orders',
+]
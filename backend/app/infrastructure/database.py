@@ -1,11 +1,15 @@
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Callable
 from contextlib import asynccontextmanager
 from typing import Any
 
+from fastapi import Depends
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
 from app.core import settings
+from app.infrastructure.pool_metrics import InstrumentedAsyncPool
+from app.infrastructure.query_stats import install_query_hooks
 
 
 class Base(DeclarativeBase):
@@ -18,10 +22,13 @@ _sqlalchemy = settings.sql_alchemy_settings
 
 engine = create_async_engine(
     url=_database.url,
+    poolclass=InstrumentedAsyncPool,
     pool_recycle=_sqlalchemy.ALCHEMY_POOL_RECYCLE,
     pool_size=_sqlalchemy.ALCHEMY_POOL_SIZE,
     max_overflow=_sqlalchemy.ALCHEMY_MAX_OVERFLOW,
+    pool_timeout=_sqlalchemy.ALCHEMY_POOL_TIMEOUT,
 )
+install_query_hooks(engine.sync_engine, _sqlalchemy.ALCHEMY_SLOW_QUERY_MS)
 
 async_session_maker = async_sessionmaker(
     bind=engine,
@@ -29,9 +36,61 @@ async_session_maker = async_sessionmaker(
 )
 
 
-async def get_db() -> AsyncGenerator[AsyncSession]:
-    async with async_session_maker() as session:
-        yield session
+class UnitOfWork:
+    """
+    Одна сессия и одна транзакция на запрос.
+
+    Сессия создается при первом обращении, соединение из пула берется при
+    первом запросе к базе. Репозитории делают только flush, фиксирует commit():
+    use case вызывает его сам, если после записи идут побочные эффекты
+    (события, кэши), иначе это делает get_uow в конце запроса.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = async_session_maker):
+        self._session_factory = session_factory
+        self._session: AsyncSession | None = None
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_factory()
+        return self._session
+
+    async def commit(self) -> None:
+        # Без открытой транзакции commit не берет соединение из пула
+        if self._session is not None:
+            await self._session.commit()
+
+    async def rollback(self) -> None:
+        if self._session is not None:
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Выполнить callback после фиксации текущей транзакции сессии."""
+    event.listen(session.sync_session, "after_commit", lambda _: callback(), once=True)
+
+
+async def get_uow() -> AsyncGenerator[UnitOfWork]:
+    # FastAPI кэширует зависимость в пределах запроса: все репозитории получают одну сессию
+    uow = UnitOfWork()
+    try:
+        yield uow
+        await uow.commit()
+    except BaseException:
+        await uow.rollback()
+        raise
+    finally:
+        await uow.close()
+
+
+async def get_db(uow: UnitOfWork = Depends(get_uow)) -> AsyncSession:
+    return uow.session
 
 
 @asynccontextmanager
@@ -42,6 +101,10 @@ async def get_db_context() -> AsyncGenerator[AsyncSession, Any]:
 
 __all__ = [
         'Base',
+        'UnitOfWork',
+        'after_commit',
         'async_session_maker',
         'get_db',
+        'get_db_context',
+        'get_uow',
 ]
@@ -0,0 +1,229 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+
+import aiosmtplib
+from loguru import logger
+
+from app.core.configs import EmailSettings, settings
+from app.domain.models.outbox_email import OutboxEmail
+from app.infrastructure.database import get_db_context
+from app.infrastructure.orm.email_outbox_repository import SqlEmailOutboxRepository
+
+
+class SmtpConnection:
+    """
+    Одно долгоживущее SMTP-соединение: TLS-рукопожатие и авторизация выполняются
+    один раз, а не на каждое письмо. Простаивающее соединение закрывается,
+    разорванное сервером открывается заново при следующей отправке.
+    """
+
+    def __init__(self, config: EmailSettings):
+        self.config = config
+        self._client: aiosmtplib.SMTP | None = None
+        self._last_used = 0.0
+
+    async def send(self, message: EmailMessage) -> None:
+        if self._client is None or not self._client.is_connected:
+            await self._connect()
+        try:
+            await self._client.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            # Сервер мог закрыть соединение по таймауту, пока воркер ждал писем
+            await self._connect()
+            await self._client.send_message(message)
+        self._last_used = time.monotonic()
+
+    async def close_if_idle(self) -> None:
+        if self._client is not None and time.monotonic() - self._last_used >= self.config.MAIL_IDLE_SECONDS:
+            await self.close()
+
+    async def close(self) -> None:
+        if self._client is None:
+            return
+        client, self._client = self._client, None
+        try:
+            if client.is_connected:
+                await client.quit()
+        except aiosmtplib.SMTPException:
+            client.close()
+
+    async def _connect(self) -> None:
+        await self.close()
+        config = self.config
+        client = aiosmtplib.SMTP(
+            hostname=config.MAIL_SERVER,
+            port=config.MAIL_PORT,
+            use_tls=config.MAIL_SSL_TLS,
+            start_tls=config.MAIL_STARTTLS,
+            validate_certs=config.MAIL_VALIDATE_CERTS,
+            username=config.MAIL_USERNAME or None,
+            password=config.MAIL_PASSWORD.get_secret_value() or None,
+            timeout=config.MAIL_TIMEOUT_SECONDS,
+        )
+        # connect() сам выполняет STARTTLS и LOGIN по настройкам клиента
+        await client.connect()
+        self._client = client
+        self._last_used = time.monotonic()
+        logger.info(f"Connected to SMTP server {config.MAIL_SERVER}:{config.MAIL_PORT}")
+
+
+class EmailOutboxWorker:
+    """
+    Фоновая отправка писем из email_outbox.
+
+    Пачка до batch_size писем берется в короткой транзакции (аренда, см.
+    SqlEmailOutboxRepository.claim_due), отправляется через одно соединение, а
+    результат каждого письма фиксируется сразу после отправки: ни блокировки,
+    ни соединение из пула не держатся на время SMTP. Ошибка сервера 5xx
+    считается окончательной, остальные (обрыв, таймаут, 4xx) откладывают письмо
+    с экспоненциальной задержкой до max_attempts попыток. Если не удалось
+    соединение, остаток пачки откладывается целиком, а не ждет таймаут на каждое письмо.
+    """
+
+    def __init__(
+        self,
+        smtp: SmtpConnection,
+        sender: str,
+        batch_size: int,
+        poll_interval: float,
+        max_attempts: int,
+        backoff: float,
+        backoff_max: float,
+    ):
+        self.smtp = smtp
+        self.sender = sender
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        # Аренда покрывает худший случай: таймаут на каждом письме пачки
+        self.lease = timedelta(seconds=smtp.config.MAIL_TIMEOUT_SECONDS * (batch_size + 1))
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.smtp.close()
+
+    def wake(self) -> None:
+        """Вызывается после commit запроса, поставившего письмо, чтобы не ждать poll_interval."""
+        self._wakeup.set()
+
+    async def process_batch(self) -> int:
+        """Отправляет одну пачку. Возвращает число взятых из очереди писем."""
+        now = datetime.now(timezone.utc)
+        async with get_db_context() as db:
+            emails = await SqlEmailOutboxRepository(db).claim_due(self.batch_size, now, now + self.lease)
+            await db.commit()
+
+        for index, email in enumerate(emails):
+            try:
+                await self.smtp.send(self._build_message(email))
+            except (aiosmtplib.SMTPAuthenticationError, aiosmtplib.SMTPConnectError) as e:
+                await self._postpone(emails[index:], e)
+                break
+            except aiosmtplib.SMTPResponseException as e:
+                # Ответ сервера относится к этому письму, соединение можно использовать дальше
+                await self._reject(email, e.code, e.message)
+            except aiosmtplib.SMTPRecipientsRefused as e:
+                # Получатель у письма один, значит и отказ один
+                refused = e.recipients[0]
+                await self._reject(email, refused.code, refused.message)
+            except (aiosmtplib.SMTPException, OSError) as e:
+                await self._postpone(emails[index:], e)
+                break
+            except Exception as e:
+                # Ошибка не соединения (например, при сборке письма): остальные письма пачки не затронуты
+                logger.exception(f"Unexpected error while sending email {email.id}")
+                await self._postpone([email], repr(e))
+            else:
+                async with get_db_context() as db:
+                    await SqlEmailOutboxRepository(db).mark_sent(email.id)
+                    await db.commit()
+        return len(emails)
+
+    async def _reject(self, email: OutboxEmail, code: int, message: str) -> None:
+        error = f"{code} {message}"
+        if 500 <= code < 600:
+            await self._fail(email, error)
+        else:
+            await self._postpone([email], error)
+
+    async def _fail(self, email: OutboxEmail, error: str) -> None:
+        logger.error(f"Email {email.id} to {email.recipient} rejected: {error}")
+        async with get_db_context() as db:
+            await SqlEmailOutboxRepository(db).mark_failed(email.id, error)
+            await db.commit()
+
+    async def _postpone(self, emails: list[OutboxEmail], error: Exception | str) -> None:
+        if isinstance(error, Exception):
+            # Сбой соединения: следующее письмо откроет новое
+            await self.smtp.close()
+            error = str(error) or type(error).__name__
+        logger.warning(f"Failed to send {len(emails)} email(s), will retry: {error}")
+        now = datetime.now(timezone.utc)
+        async with get_db_context() as db:
+            repo = SqlEmailOutboxRepository(db)
+            for email in emails:
+                if email.attempts + 1 >= self.max_attempts:
+                    await repo.mark_failed(email.id, error)
+                else:
+                    delay = min(self.backoff * 2 ** email.attempts, self.backoff_max)
+                    await repo.reschedule(email.id, error, now + timedelta(seconds=delay))
+            await db.commit()
+
+    def _build_message(self, email: OutboxEmail) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = email.recipient
+        message["Subject"] = email.subject
+        message.set_content(email.body, subtype="html")
+        return message
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                claimed = await self.process_batch()
+            except Exception as e:
+                logger.error(f"Email outbox batch failed: {e}")
+                claimed = 0
+            if claimed < self.batch_size:
+                # Очередь разобрана: ждем нового письма или следующего опроса
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except TimeoutError:
+                    await self.smtp.close_if_idle()
+                self._wakeup.clear()
+
+
+_email = settings.email_settings
+
+email_outbox = EmailOutboxWorker(
+    SmtpConnection(_email),
+    sender=_email.MAIL_FROM,
+    batch_size=_email.EMAIL_OUTBOX_BATCH_SIZE,
+    poll_interval=_email.EMAIL_OUTBOX_POLL_SECONDS,
+    max_attempts=_email.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    backoff=_email.EMAIL_OUTBOX_BACKOFF_SECONDS,
+    backoff_max=_email.EMAIL_OUTBOX_BACKOFF_MAX_SECONDS,
+)
+
+
+__all__ = [
+        'EmailOutboxWorker',
+        'SmtpConnection',
+        'email_outbox',
+]
@@ -0,0 +1,151 @@
+import bisect
+import time
+
+from app.infrastructure.pool_metrics import PoolMetrics
+
+# Границы корзин гистограммы длительности запроса, секунды
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Метка для запросов, не попавших ни в один маршрут (404): сырой путь дал бы неограниченное число серий
+UNMATCHED_ROUTE = "unmatched"
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+
+
+class HttpMetrics:
+    """
+    Счетчики запросов по шаблону маршрута (/orders/{order_id}), а не по пути.
+
+    Запись - несколько операций со словарем без блокировок: все вызовы идут из
+    одного event loop. Данные свои у каждого воркера, Prometheus суммирует их сам.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self.in_flight = 0
+        self.requests: dict[tuple[str, str, int], int] = {}
+        self.durations: dict[tuple[str, str], _Histogram] = {}
+
+    def observe(self, method: str, route: str, status: int, duration: float) -> None:
+        key = (method, route, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.durations.get((method, route))
+        if histogram is None:
+            histogram = self.durations[(method, route)] = _Histogram(len(self.buckets) + 1)
+        histogram.counts[bisect.bisect_left(self.buckets, duration)] += 1
+        histogram.sum += duration
+
+    def render(self) -> list[str]:
+        lines = [
+            "# HELP http_requests_total HTTP requests by route template and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}')
+        lines += [
+            "# HELP http_requests_in_progress HTTP requests being processed.",
+            "# TYPE http_requests_in_progress gauge",
+            f"http_requests_in_progress {self.in_flight}",
+            "# HELP http_request_duration_seconds HTTP request latency by route template.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.durations.items()):
+            labels = f'method="{method}",route="{_escape(route)}"'
+            lines += _histogram_lines("http_request_duration_seconds", labels, self.buckets, histogram.counts, histogram.sum)
+        return lines
+
+
+class MetricsMiddleware:
+    """
+    Чистый ASGI middleware без BaseHTTPMiddleware: тело ответа не буферизуется
+    и не создается лишняя задача на запрос.
+
+    Маршрут берется из scope["route"], который FastAPI заполняет при
+    сопоставлении, поэтому он известен только после вызова приложения.
+    Для потоковых ответов (SSE) длительность - время жизни потока.
+    """
+
+    def __init__(self, app, metrics: HttpMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics = self.metrics
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.in_flight -= 1
+            route = scope.get("route")
+            metrics.observe(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status,
+                time.perf_counter() - started,
+            )
+
+
+def render_pool_metrics(metrics: PoolMetrics, pool) -> list[str]:
+    snapshot = metrics.snapshot(pool)
+    lines = []
+    for name, kind, help_text, value in (
+        ("db_pool_size", "gauge", "Configured pool size.", snapshot["size"]),
+        ("db_pool_connections_in_use", "gauge", "Connections checked out of the pool.", snapshot["in_use"]),
+        ("db_pool_connections_idle", "gauge", "Idle connections in the pool.", snapshot["idle"]),
+        ("db_pool_overflow", "gauge", "Connections open above pool size.", snapshot["overflow"]),
+        ("db_pool_checkouts_total", "counter", "Connections handed out by the pool.", snapshot["checkouts"]),
+        ("db_pool_timeouts_total", "counter", "Checkouts that hit pool_timeout.", snapshot["timeouts"]),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+    lines += [
+        "# HELP db_pool_checkout_wait_seconds Time to get a connection from the pool.",
+        "# TYPE db_pool_checkout_wait_seconds histogram",
+    ]
+    buckets = tuple(bound / 1000 for bound in metrics.buckets_ms)
+    lines += _histogram_lines("db_pool_checkout_wait_seconds", "", buckets, metrics.bucket_counts, metrics.wait_sum_ms / 1000)
+    return lines
+
+
+def _histogram_lines(name: str, labels: str, buckets: tuple[float, ...], counts: list[int], total: float) -> list[str]:
+    prefix = f"{labels}," if labels else ""
+    lines, cumulative = [], 0
+    for bound, count in zip([*buckets, "+Inf"], counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {total}")
+    lines.append(f"{name}_count{suffix} {cumulative}")
+    return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+http_metrics = HttpMetrics()
+
+
+__all__ = [
+        'HttpMetrics',
+        'MetricsMiddleware',
+        'http_metrics',
+        'render_pool_metrics',
+]
@@ -0,0 +1,135 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from loguru import logger
+
+from app.core.configs import settings
+from app.domain.models.pizza import Pizza
+from app.infrastructure.database import get_db_context
+from app.infrastructure.orm.pizza_repository import SqlPizzaRepository
+from app.infrastructure.query_stats import untracked_context
+
+
+@dataclass
+class _Entry:
+    items: list[Pizza]
+    version: int
+    loaded_at: float
+
+
+class MenuCache:
+    """
+    Кэш меню в памяти процесса.
+
+    Каждая страница меню (категория, размер, курсор) хранится отдельным снимком,
+    помеченным версией, с которой он был загружен. Снимок считается свежим, пока
+    не истек TTL и версия не изменилась (invalidate()). Устаревший снимок
+    продолжает отдаваться, пока в фоне идет одна перезагрузка, поэтому чтение
+    меню почти никогда не ждет базу данных.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[..., Awaitable[list[Pizza]]],
+        ttl: float,
+        max_entries: int = 256,
+    ):
+        self._loader = loader
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.version = 0
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._locks: dict[tuple, asyncio.Lock] = {}
+        self._refresh_tasks: dict[tuple, asyncio.Task] = {}
+
+    def invalidate(self) -> int:
+        self.version += 1
+        return self.version
+
+    def clear(self) -> None:
+        """Забывает все снимки. invalidate() их только помечает устаревшими, нужно тестам."""
+        for task in self._refresh_tasks.values():
+            task.cancel()
+        self._entries.clear()
+        self._locks.clear()
+        self._refresh_tasks.clear()
+
+    def _is_fresh(self, entry: _Entry) -> bool:
+        return (
+            entry.version == self.version
+            and time.monotonic() - entry.loaded_at < self.ttl
+        )
+
+    async def get(self, *key) -> list[Pizza]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if not self._is_fresh(entry):
+                self._schedule_refresh(key)
+            return entry.items
+
+        # Холодный старт: отдавать нечего, ждем первую загрузку
+        async with self._lock_for(key):
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = await self._refresh(key)
+        return entry.items
+
+    def _lock_for(self, key: tuple) -> asyncio.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    def _schedule_refresh(self, key: tuple) -> None:
+        task = self._refresh_tasks.get(key)
+        if task is not None and not task.done():
+            return
+        # Запросы фоновой перезагрузки не относятся к запросу, который ее запустил
+        self._refresh_tasks[key] = asyncio.create_task(self._refresh_locked(key), context=untracked_context())
+
+    async def _refresh_locked(self, key: tuple) -> None:
+        try:
+            async with self._lock_for(key):
+                entry = self._entries.get(key)
+                if entry is not None and self._is_fresh(entry):
+                    return
+                await self._refresh(key)
+        except Exception as e:
+            logger.error(f"Menu cache refresh failed for {key}: {e}")
+        finally:
+            self._refresh_tasks.pop(key, None)
+
+    async def _refresh(self, key: tuple) -> _Entry:
+        # Версию фиксируем до чтения: если меню изменится во время загрузки,
+        # снимок сразу окажется устаревшим и будет перечитан
+        version = self.version
+        items = await self._loader(*key)
+        entry = _Entry(items=items, version=version, loaded_at=time.monotonic())
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._locks.pop(evicted, None)
+        return entry
+
+
+async def _load_menu_page(category: str | None, limit: int, after_id: int | None) -> list[Pizza]:
+    # Фоновая перезагрузка переживает запрос, поэтому у нее своя сессия
+    async with get_db_context() as db:
+        return await SqlPizzaRepository(db).get_page(category, limit, after_id)
+
+
+menu_cache = MenuCache(
+    _load_menu_page,
+    ttl=settings.cache_settings.MENU_CACHE_TTL_SECONDS,
+    max_entries=settings.cache_settings.MENU_CACHE_MAX_ENTRIES,
+)
+
+
+__all__ = [
+        'MenuCache',
+        'menu_cache',
+]
@@ -0,0 +1,212 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import asyncpg
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.configs import settings
+from app.infrastructure.database import engine
+
+ORDER_CREATED = "order_created"
+ORDER_STATUS_CHANGED = "order_status_changed"
+
+
+class PostgresNotifyBridge:
+    """
+    Пересылка событий между воркерами через Postgres LISTEN/NOTIFY.
+
+    Каждый воркер слушает канал на отдельном соединении asyncpg вне пула (оно
+    занято все время работы) и раздает пришедшие уведомления локальным
+    подписчикам, в том числе собственные публикации. Публикации идут через то
+    же соединение, чтобы не брать соединение из пула на каждый NOTIFY; пока
+    его нет, используется пул. Оборванное соединение открывается заново с
+    экспоненциальной задержкой; события, пришедшие во время разрыва, теряются.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        channel: str,
+        on_event,
+        ping_interval: float = 30.0,
+        reconnect_max: float = 30.0,
+    ):
+        self._engine = engine
+        self.channel = channel
+        self._on_event = on_event
+        self.ping_interval = ping_interval
+        self.reconnect_max = reconnect_max
+        self._listener: asyncio.Task | None = None
+        self._conn: asyncpg.Connection | None = None
+        # asyncpg не выполняет на одном соединении два запроса одновременно
+        self._conn_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen_forever())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen_forever(self) -> None:
+        delay = 1.0
+        while True:
+            connected = asyncio.Event()
+            try:
+                await self._listen(connected)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Order events listener on '{self.channel}' failed: {e}")
+            else:
+                logger.warning(f"Order events listener on '{self.channel}' lost connection")
+            if connected.is_set():
+                # Соединение успело поработать: первая повторная попытка без долгой задержки
+                delay = 1.0
+            logger.info(f"Reconnecting order events listener in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.reconnect_max)
+
+    async def _listen(self, connected: asyncio.Event) -> None:
+        url = self._engine.url
+        conn = await asyncpg.connect(
+            host=url.host,
+            port=url.port,
+            user=url.username,
+            password=url.password,
+            database=url.database,
+        )
+        lost = asyncio.Event()
+        conn.add_termination_listener(lambda _: lost.set())
+        try:
+            await conn.add_listener(self.channel, self._on_notify)
+            self._conn = conn
+            connected.set()
+            logger.info(f"Listening for order events on channel '{self.channel}'")
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), self.ping_interval)
+                except TimeoutError:
+                    # Молча пропавшую сеть без запроса не заметить
+                    async with self._conn_lock:
+                        await conn.execute("SELECT 1", timeout=self.ping_interval)
+        finally:
+            self._conn = None
+            if not conn.is_closed():
+                await conn.close(timeout=5)
+
+    async def notify(self, events: list[dict]) -> None:
+        payloads = [json.dumps(event) for event in events]
+        conn = self._conn
+        if conn is not None and not conn.is_closed():
+            # Вне транзакции: каждое уведомление уходит сразу, все - одним запросом
+            async with self._conn_lock:
+                await conn.execute(
+                    "SELECT pg_notify($1, payload) FROM unnest($2::text[]) AS payload",
+                    self.channel,
+                    payloads,
+                )
+            return
+        async with self._engine.connect() as conn:
+            await conn.execute(
+                text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+                {"channel": self.channel, "payloads": payloads},
+            )
+            await conn.commit()
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            self._on_event(json.loads(payload))
+        except ValueError:
+            logger.error(f"Malformed order event payload: {payload!r}")
+
+
+class OrderEventHub:
+    """
+    Внутрипроцессный pub/sub для событий заказов.
+
+    У каждого подписчика своя ограниченная очередь: если клиент не успевает
+    читать, самые старые события отбрасываются, чтобы не блокировать публикацию.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 100,
+        bridge_channel: str | None = None,
+        ping_interval: float = 30.0,
+        reconnect_max: float = 30.0,
+    ):
+        self.queue_size = queue_size
+        self._subscribers: set[asyncio.Queue] = set()
+        self._bridge = (
+            PostgresNotifyBridge(engine, bridge_channel, self._dispatch, ping_interval, reconnect_max)
+            if bridge_channel
+            else None
+        )
+
+    async def start(self) -> None:
+        if self._bridge is not None:
+            await self._bridge.start()
+
+    async def stop(self) -> None:
+        if self._bridge is not None:
+            await self._bridge.stop()
+
+    async def publish(self, event: dict) -> None:
+        await self.publish_many([event])
+
+    async def publish_many(self, events: list[dict]) -> None:
+        if not events:
+            return
+        try:
+            if self._bridge is not None:
+                await self._bridge.notify(events)
+            else:
+                for event in events:
+                    self._dispatch(event)
+        except Exception as e:
+            # Доставка событий не должна ломать запись заказа
+            logger.error(f"Failed to publish {len(events)} order event(s): {e}")
+
+    @asynccontextmanager
+    async def subscription(self) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    def _dispatch(self, event: dict) -> None:
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+
+_events = settings.event_settings
+
+order_event_hub = OrderEventHub(
+    queue_size=_events.ORDER_EVENTS_QUEUE_SIZE,
+    bridge_channel=_events.ORDER_EVENTS_CHANNEL if _events.ORDER_EVENTS_BACKEND == "postgres" else None,
+    ping_interval=_events.ORDER_EVENTS_LISTEN_PING_SECONDS,
+    reconnect_max=_events.ORDER_EVENTS_RECONNECT_MAX_SECONDS,
+)
+
+
+__all__ = [
+        'ORDER_CREATED',
+        'ORDER_STATUS_CHANGED',
+        'OrderEventHub',
+        'order_event_hub',
+]
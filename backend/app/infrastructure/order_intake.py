@@ -0,0 +1,127 @@
+import asyncio
+
+from loguru import logger
+
+from app.core.configs import settings
+from app.domain.models.order import Order
+from app.infrastructure.database import get_db_context
+from app.infrastructure.orm.order_repository import SqlOrderRepository
+
+
+class OrderIntakeQueue:
+    """
+    Групповая запись заказов (group commit).
+
+    Запросы кладут заказ в очередь и ждут future с его id. Фоновый писатель
+    забирает до max_batch заказов или ждет не дольше max_delay секунд после
+    первого и записывает всю пачку одной транзакцией на одном соединении.
+    После stop() (и до start()) заказы пишутся сразу, без очереди.
+    """
+
+    def __init__(self, max_batch: int, max_delay: float, queue_size: int):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._writer: asyncio.Task | None = None
+        self._stopped = True
+
+    async def start(self) -> None:
+        if self._writer is None:
+            self._stopped = False
+            self._writer = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._writer is None:
+            return
+        # Новые заказы идут мимо очереди; None - сигнал писателю дописать
+        # принятые заказы и завершиться
+        self._stopped = True
+        await self._queue.put(None)
+        await self._writer
+        self._writer = None
+        # Заказы, попавшие в очередь после сигнала: их ждут запросы, начатые до stop()
+        while True:
+            # Даем ждущим put() дописать в освободившееся место
+            await asyncio.sleep(0)
+            batch = []
+            while not self._queue.empty() and len(batch) < self.max_batch:
+                entry = self._queue.get_nowait()
+                if entry is not None:
+                    batch.append(entry)
+            if not batch:
+                break
+            await self._write(batch)
+
+    async def submit(self, order: Order) -> int:
+        future = asyncio.get_running_loop().create_future()
+        if self._stopped:
+            # Писателя нет: без этого запрос ждал бы future вечно
+            await self._write([(order, future)])
+        else:
+            await self._queue.put((order, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            entry = await self._queue.get()
+            if entry is None:
+                break
+            batch = [entry]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+            await self._write(batch)
+
+    async def _write(self, batch: list[tuple[Order, asyncio.Future]]) -> None:
+        try:
+            async with get_db_context() as db:
+                order_ids = await SqlOrderRepository(db).save_many([order for order, _ in batch])
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Batch insert of {len(batch)} orders failed, retrying one by one: {e}")
+            # Один некорректный заказ не должен ронять всю пачку
+            for order, future in batch:
+                order.id = None
+                try:
+                    async with get_db_context() as db:
+                        order_id = await SqlOrderRepository(db).save(order)
+                        await db.commit()
+                except Exception as single_error:
+                    if not future.done():
+                        future.set_exception(single_error)
+                else:
+                    if not future.done():
+                        future.set_result(order_id)
+            return
+
+        for (_, future), order_id in zip(batch, order_ids):
+            # Клиент мог отключиться и отменить ожидание
+            if not future.done():
+                future.set_result(order_id)
+
+
+_intake = settings.order_intake_settings
+
+order_intake = OrderIntakeQueue(
+    max_batch=_intake.ORDER_INTAKE_MAX_BATCH,
+    max_delay=_intake.ORDER_INTAKE_MAX_DELAY_MS / 1000,
+    queue_size=_intake.ORDER_INTAKE_QUEUE_SIZE,
+)
+
+
+__all__ = [
+        'OrderIntakeQueue',
+        'order_intake',
+]
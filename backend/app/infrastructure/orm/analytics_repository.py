@@ -0,0 +1,255 @@
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import List
+
+from sqlalchemy import ARRAY, Date, Integer, and_, any_, cast, delete, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.abc_repositories.analytics_repository import IAnalyticsRepository
+from app.domain.models.analytics import DailyRevenue, ProductSales, StatusCount
+from app.domain.models.order import Order
+from app.infrastructure.orm.models import DailySalesORM, OrderItemModel, OrderModel, ProductSalesORM
+
+CANCELLED = "cancelled"
+
+
+class SqlAnalyticsRepository(IAnalyticsRepository):
+    """
+    Сводные таблицы продаж.
+
+    Методы record_* вызываются репозиторием заказов в той же транзакции, что и
+    запись заказа, и только прибавляют дельты к строкам сводок (upsert).
+    Отчеты читают только сводки и не трогают историю заказов.
+    День заказа считается по UTC.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @property
+    def _is_postgres(self) -> bool:
+        return self.db.get_bind().dialect.name == "postgresql"
+
+    def _insert(self, model):
+        return pg_insert(model) if self._is_postgres else sqlite_insert(model)
+
+    def _order_day(self, created_at=OrderModel.created_at):
+        if self._is_postgres:
+            # Литерал, а не параметр: выражение должно совпадать в SELECT и GROUP BY
+            return cast(func.timezone(literal_column("'UTC'"), created_at), Date)
+        return func.date(created_at)
+
+    def _in(self, column, values: list[int]):
+        # В PostgreSQL список уходит одним параметром-массивом: IN с тысячами
+        # параметров упрется в лимит asyncpg
+        if self._is_postgres:
+            return column == any_(literal(values, ARRAY(Integer)))
+        return column.in_(values)
+
+    @staticmethod
+    def _item_order_join():
+        # Ключ партиционирования в условии позволяет соединять партиции попарно
+        return and_(
+            OrderItemModel.order_id == OrderModel.id,
+            OrderItemModel.order_created_at == OrderModel.created_at,
+        )
+
+    # --- Инкрементальное обновление -------------------------------------
+
+    async def record_orders_created(self, orders: list[Order]) -> None:
+        daily: dict[tuple[date, str], list] = defaultdict(lambda: [0, Decimal(0)])
+        products: dict[tuple[date, int], list] = defaultdict(lambda: [0, Decimal(0)])
+        for order in orders:
+            day = _utc_date(order.created_at)
+            daily[(day, order.status)][0] += 1
+            daily[(day, order.status)][1] += order.total_price
+            if order.status == CANCELLED:
+                continue
+            for item in order.items:
+                products[(day, item.product_id)][0] += item.quantity
+                products[(day, item.product_id)][1] += item.price * item.quantity
+
+        # Строки агрегированы по ключу заранее: ON CONFLICT не может обновить строку дважды
+        if daily:
+            await self._add_daily([
+                (day, status, count, revenue) for (day, status), (count, revenue) in daily.items()
+            ])
+        if products:
+            stmt = self._insert(ProductSalesORM).values([
+                {"day": day, "product_id": product_id, "quantity": quantity, "revenue": revenue}
+                for (day, product_id), (quantity, revenue) in products.items()
+            ])
+            await self.db.execute(self._accumulate(stmt, ProductSalesORM, ["day", "product_id"]))
+
+    async def record_status_changes(self, changes: list[tuple[int, datetime, Decimal, str | None, str]]) -> None:
+        """
+        changes: (order_id, created_at, total_price, previous_status, status) для
+        каждого измененного заказа. Сводка по дням считается из этих значений без
+        чтения заказов, позиции читаются только при отмене заказа и ее снятии.
+        """
+        daily: dict[tuple[date, str], list] = defaultdict(lambda: [0, Decimal(0)])
+        cancelled, restored = [], []
+        for order_id, created_at, total_price, previous_status, status in changes:
+            previous_status = previous_status or "pending"
+            if previous_status == status:
+                continue
+            day = _utc_date(created_at)
+            daily[(day, previous_status)][0] -= 1
+            daily[(day, previous_status)][1] -= total_price
+            daily[(day, status)][0] += 1
+            daily[(day, status)][1] += total_price
+            if status == CANCELLED:
+                cancelled.append((order_id, created_at))
+            elif previous_status == CANCELLED:
+                restored.append((order_id, created_at))
+
+        if daily:
+            await self._add_daily([
+                (day, status, count, revenue) for (day, status), (count, revenue) in daily.items()
+            ])
+        if cancelled:
+            await self._shift_products(cancelled, -1)
+        if restored:
+            await self._shift_products(restored, 1)
+
+    async def _add_daily(self, rows: list[tuple[date, str, int, Decimal]]) -> None:
+        stmt = self._insert(DailySalesORM).values([
+            {"day": day, "status": status, "order_count": count, "revenue": revenue}
+            for day, status, count, revenue in rows
+        ])
+        await self.db.execute(self._accumulate(stmt, DailySalesORM, ["day", "status"]))
+
+    async def _shift_products(self, orders: list[tuple[int, datetime]], sign: int) -> None:
+        # orders: (id, created_at). Границы created_at отсекают лишние партиции
+        # order_items, а день берется из order_created_at без соединения с orders
+        created = [created_at for _, created_at in orders]
+        day = self._order_day(OrderItemModel.order_created_at)
+        source = (
+            select(
+                day.label("day"),
+                OrderItemModel.product_id,
+                (func.sum(OrderItemModel.quantity) * sign).label("quantity"),
+                (func.sum(OrderItemModel.price * OrderItemModel.quantity) * sign).label("revenue"),
+            )
+            .where(
+                self._in(OrderItemModel.order_id, [order_id for order_id, _ in orders]),
+                OrderItemModel.order_created_at.between(min(created), max(created)),
+                OrderItemModel.product_id.is_not(None),
+            )
+            .group_by(day, OrderItemModel.product_id)
+        )
+        stmt = self._insert(ProductSalesORM).from_select(["day", "product_id", "quantity", "revenue"], source)
+        await self.db.execute(self._accumulate(stmt, ProductSalesORM, ["day", "product_id"]))
+
+    @staticmethod
+    def _accumulate(stmt, model, keys: list[str]):
+        columns = [c.name for c in model.__table__.columns if c.name not in keys]
+        return stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={name: getattr(model, name) + getattr(stmt.excluded, name) for name in columns},
+        )
+
+    # --- Полный пересчет ------------------------------------------------
+
+    async def rebuild(self) -> None:
+        """Пересчитывает сводки по order_items. Вызывающий код делает commit."""
+        await self.db.execute(delete(DailySalesORM))
+        await self.db.execute(delete(ProductSalesORM))
+
+        day = self._order_day()
+        order_totals = (
+            select(
+                OrderModel.id,
+                func.coalesce(OrderModel.status, literal_column("'pending'")).label("status"),
+                day.label("day"),
+                func.coalesce(func.sum(OrderItemModel.price * OrderItemModel.quantity), 0).label("total"),
+            )
+            .outerjoin(OrderItemModel, self._item_order_join())
+            .group_by(OrderModel.id, OrderModel.status, day)
+            .subquery()
+        )
+        await self.db.execute(
+            self._insert(DailySalesORM).from_select(
+                ["day", "status", "order_count", "revenue"],
+                select(
+                    order_totals.c.day,
+                    order_totals.c.status,
+                    func.count(),
+                    func.sum(order_totals.c.total),
+                ).group_by(order_totals.c.day, order_totals.c.status),
+            )
+        )
+        await self.db.execute(
+            self._insert(ProductSalesORM).from_select(
+                ["day", "product_id", "quantity", "revenue"],
+                select(
+                    day,
+                    OrderItemModel.product_id,
+                    func.sum(OrderItemModel.quantity),
+                    func.sum(OrderItemModel.price * OrderItemModel.quantity),
+                )
+                .join(OrderModel, self._item_order_join())
+                .where(OrderModel.status.is_distinct_from(CANCELLED), OrderItemModel.product_id.is_not(None))
+                .group_by(day, OrderItemModel.product_id),
+            )
+        )
+
+    # --- Отчеты ---------------------------------------------------------
+
+    async def revenue_by_day(self, date_from: date | None = None, date_to: date | None = None) -> List[DailyRevenue]:
+        stmt = (
+            select(
+                DailySalesORM.day,
+                func.sum(DailySalesORM.revenue).label("revenue"),
+                func.sum(DailySalesORM.order_count).label("order_count"),
+            )
+            .where(DailySalesORM.status != CANCELLED)
+            .group_by(DailySalesORM.day)
+            .order_by(DailySalesORM.day)
+        )
+        stmt = self._between(stmt, DailySalesORM.day, date_from, date_to)
+        result = await self.db.execute(stmt)
+        return [DailyRevenue(day=r.day, revenue=r.revenue, order_count=r.order_count) for r in result]
+
+    async def top_products(self, limit: int, date_from: date | None = None, date_to: date | None = None) -> List[ProductSales]:
+        quantity = func.sum(ProductSalesORM.quantity).label("quantity")
+        stmt = (
+            select(ProductSalesORM.product_id, quantity, func.sum(ProductSalesORM.revenue).label("revenue"))
+            .group_by(ProductSalesORM.product_id)
+            .having(quantity > 0)
+            .order_by(quantity.desc(), ProductSalesORM.product_id)
+            .limit(limit)
+        )
+        stmt = self._between(stmt, ProductSalesORM.day, date_from, date_to)
+        result = await self.db.execute(stmt)
+        return [ProductSales(product_id=r.product_id, quantity=r.quantity, revenue=r.revenue) for r in result]
+
+    async def order_counts_by_status(self, date_from: date | None = None, date_to: date | None = None) -> List[StatusCount]:
+        order_count = func.sum(DailySalesORM.order_count).label("order_count")
+        stmt = (
+            select(DailySalesORM.status, order_count)
+            .group_by(DailySalesORM.status)
+            .having(order_count > 0)
+            .order_by(DailySalesORM.status)
+        )
+        stmt = self._between(stmt, DailySalesORM.day, date_from, date_to)
+        result = await self.db.execute(stmt)
+        return [StatusCount(status=r.status, order_count=r.order_count) for r in result]
+
+    @staticmethod
+    def _between(stmt, column, date_from: date | None, date_to: date | None):
+        if date_from is not None:
+            stmt = stmt.where(column >= date_from)
+        if date_to is not None:
+            stmt = stmt.where(column <= date_to)
+        return stmt
+
+
+def _utc_date(value: datetime) -> date:
+    # SQLite возвращает время без зоны, в базе оно хранится в UTC
+    if value.tzinfo is None:
+        return value.date()
+    return value.astimezone(timezone.utc).date()
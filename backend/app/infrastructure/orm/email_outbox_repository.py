@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.domain.abc_repositories.email_outbox_repository import IEmailOutboxRepository
+from app.domain.models.outbox_email import OutboxEmail
+from app.infrastructure.orm.models import EmailOutboxORM
+
+class SqlEmailOutboxRepository(IEmailOutboxRepository):
+    """
+    Очередь исходящих писем в таблице email_outbox.
+
+    enqueue пишет в транзакции запроса: письмо уходит, только если запрос
+    зафиксирован. claim_due выбирает письма через FOR UPDATE SKIP LOCKED и
+    сдвигает их next_attempt_at на срок аренды: после commit блокировок уже
+    нет, но другие воркеры не возьмут эти письма, пока аренда не истечет.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue(self, email: OutboxEmail) -> OutboxEmail:
+        result = await self.db.execute(
+            insert(EmailOutboxORM)
+            .values(recipient=email.recipient, subject=email.subject, body=email.body)
+            .returning(EmailOutboxORM.id)
+        )
+        email.id = result.scalar_one()
+        return email
+
+    async def claim_due(self, limit: int, now: datetime, lease_until: datetime) -> list[OutboxEmail]:
+        result = await self.db.execute(
+            select(
+                EmailOutboxORM.id,
+                EmailOutboxORM.recipient,
+                EmailOutboxORM.subject,
+                EmailOutboxORM.body,
+                EmailOutboxORM.attempts,
+            )
+            .where(EmailOutboxORM.status == "pending", EmailOutboxORM.next_attempt_at <= now)
+            .order_by(EmailOutboxORM.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        emails = [
+            OutboxEmail(id=row.id, recipient=row.recipient, subject=row.subject, body=row.body, attempts=row.attempts)
+            for row in result
+        ]
+        if emails:
+            await self.db.execute(
+                update(EmailOutboxORM)
+                .where(EmailOutboxORM.id.in_([email.id for email in emails]))
+                .values(next_attempt_at=lease_until)
+            )
+        return emails
+
+    async def mark_sent(self, email_id: int) -> None:
+        await self.db.execute(
+            update(EmailOutboxORM)
+            .where(EmailOutboxORM.id == email_id)
+            .values(status="sent", sent_at=datetime.now(timezone.utc), last_error=None)
+        )
+
+    async def reschedule(self, email_id: int, error: str, next_attempt_at: datetime) -> None:
+        await self.db.execute(
+            update(EmailOutboxORM)
+            .where(EmailOutboxORM.id == email_id)
+            .values(attempts=EmailOutboxORM.attempts + 1, last_error=error, next_attempt_at=next_attempt_at)
+        )
+
+    async def mark_failed(self, email_id: int, error: str) -> None:
+        await self.db.execute(
+            update(EmailOutboxORM)
+            .where(EmailOutboxORM.id == email_id)
+            .values(status="failed", attempts=EmailOutboxORM.attempts + 1, last_error=error)
+        )
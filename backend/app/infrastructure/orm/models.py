@@ -1,7 +1,35 @@
-from sqlalchemy import Boolean, Column, Integer, Numeric, String, ForeignKey
+from datetime import datetime, timezone
+
+from sqlalchemy import Boolean, Column, Computed, Date, DateTime, Integer, Numeric, PrimaryKeyConstraint, String, ForeignKey, ForeignKeyConstraint, Index, func, text
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship
+from sqlalchemy.schema import CreateColumn
 from app.infrastructure.database import Base
 
+
+# SQLite (тесты, локальная разработка) не умеет AUTOINCREMENT в составном
+# первичном ключе. Для таблиц с ключом (id, created_at) id там становится
+# INTEGER PRIMARY KEY, а составной ключ - UNIQUE: на него по-прежнему может
+# ссылаться внешний ключ позиций. В PostgreSQL схема не меняется
+def _sqlite_rowid_column(column) -> bool:
+    primary_key = column.table.primary_key.columns
+    return len(primary_key) > 1 and column.autoincrement is True and column.key in primary_key
+
+
+@compiles(CreateColumn, "sqlite")
+def _sqlite_create_column(element, compiler, **kw):
+    column = element.element
+    if _sqlite_rowid_column(column):
+        return f"{compiler.preparer.format_column(column)} INTEGER PRIMARY KEY AUTOINCREMENT"
+    return compiler.visit_create_column(element, **kw)
+
+
+@compiles(PrimaryKeyConstraint, "sqlite")
+def _sqlite_primary_key(constraint, compiler, **kw):
+    if any(_sqlite_rowid_column(column) for column in constraint.columns):
+        return "UNIQUE (%s)" % ", ".join(compiler.preparer.format_column(column) for column in constraint.columns)
+    return compiler.visit_primary_key_constraint(constraint, **kw)
+
 class PizzaORM(Base):
     __tablename__ = "products"
 
@@ -11,26 +39,94 @@ class PizzaORM(Base):
     description = Column(String, nullable=True)
     category = Column(String, nullable=False, default="pizza")
     image_url = Column(String, nullable=True)
+    # Документ для полнотекстового поиска, по нему построен триграммный индекс
+    search_document = Column(
+        String,
+        Computed("lower(name || ' ' || coalesce(description, ''))", persisted=True),
+    )
+
+    __table_args__ = (
+        Index("ix_products_category_id", "category", "id"),
+        Index(
+            "ix_products_search_document_trgm",
+            "search_document",
+            postgresql_using="gin",
+            postgresql_ops={"search_document": "gin_trgm_ops"},
+        ),
+    )
 
 
 class OrderModel(Base):
+    """Заказы партиционированы по месяцам (RANGE по created_at), см. order_partitions."""
     __tablename__ = "orders"
-    id = Column(Integer, primary_key=True)
+    # Первичный ключ (id, created_at), как в миграции bcf5194b801f: ключ
+    # партиционирования обязан входить в первичный. id по-прежнему из последовательности
+    id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, nullable=True)
     status = Column(String, default="pending")
     delivery_address = Column(String, nullable=True)
+    # Значение задается приложением: позиции ссылаются на заказ по (id, created_at), и
+    # на SQLite строка из CURRENT_TIMESTAMP не совпала бы с тем же временем из Python
+    created_at = Column(DateTime(timezone=True), primary_key=True, default=lambda: datetime.now(timezone.utc), server_default=func.now(), index=True)
+    # Денормализованные итоги, заполняются при записи заказа
+    total_price = Column(Numeric(12, 2), nullable=False, server_default="0")
+    item_count = Column(Integer, nullable=False, server_default="0")
     items = relationship("OrderItemModel", back_populates="order")
 
+    __table_args__ = (
+        # Частичный индекс только по незавершенным заказам: его размер не растет с историей
+        Index(
+            "ix_orders_active_status_id",
+            "status",
+            "id",
+            postgresql_where=text("status NOT IN ('delivered', 'cancelled')"),
+            sqlite_where=text("status NOT IN ('delivered', 'cancelled')"),
+        ),
+        Index("ix_orders_user_id_id", "user_id", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
 class OrderItemModel(Base):
     __tablename__ = "order_items"
-    id = Column(Integer, primary_key=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    order_id = Column(Integer, nullable=False)
+    # created_at заказа: позиции лежат в партиции того же месяца, что и заказ.
+    # Первичный ключ (id, order_created_at), как и у заказов
+    order_created_at = Column(DateTime(timezone=True), primary_key=True)
     product_id = Column(Integer)
     quantity = Column(Integer)
     price = Column(Numeric(10, 2), nullable=False)
 
     order = relationship("OrderModel", back_populates="items")
 
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["order_id", "order_created_at"],
+            ["orders.id", "orders.created_at"],
+            name="order_items_order_fkey",
+        ),
+        Index("ix_order_items_order_id", "order_id", "order_created_at"),
+        {"postgresql_partition_by": "RANGE (order_created_at)"},
+    )
+
+class DailySalesORM(Base):
+    """Сводка заказов по дням и статусам, обновляется при записи заказов."""
+    __tablename__ = "sales_daily"
+
+    day = Column(Date, primary_key=True)
+    status = Column(String, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+
+class ProductSalesORM(Base):
+    """Продажи товаров по дням (без отмененных заказов)."""
+    __tablename__ = "sales_daily_products"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+
 class UserORM(Base):
     __tablename__ = "users"
 
@@ -40,3 +136,42 @@ class UserORM(Base):
     is_active = Column(Boolean, default=True)
     role = Column(String, default="employee", nullable=False, server_default="'employee'")
     is_verified = Column(Boolean, default=False)
+    token_epoch = Column(Integer, nullable=False, default=0, server_default="0")
+    token_epoch_changed_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+class RefreshTokenORM(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # sha256 от токена: само значение в базе не хранится
+    token_hash = Column(String(64), nullable=False, unique=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+
+class EmailOutboxORM(Base):
+    """Исходящие письма: запрос только ставит письмо в очередь, отправляет email_outbox."""
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="pending", server_default="pending")  # pending | sent | failed
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    # Пока письмо отправляется, здесь срок аренды: после падения воркера его возьмет другой
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc), server_default=func.now())
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Воркер выбирает только ожидающие письма, отправленные в индекс не попадают
+        Index(
+            "ix_email_outbox_pending_next_attempt_at",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
@@ -0,0 +1,124 @@
+import re
+from datetime import date
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+ARCHIVE_SCHEMA = "archive"
+# Родительская таблица идет первой: партиции позиций ссылаются на партиции заказов
+PARTITIONED_TABLES = ("orders", "order_items")
+_PARTITION_RE = re.compile(r"^orders_p(\d{4})_(\d{2})$")
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+class OrderPartitionManager:
+    """
+    Помесячные партиции orders и order_items (RANGE по created_at, UTC).
+
+    Все DDL идут на переданном соединении. Для detach_month соединение должно
+    быть в режиме AUTOCOMMIT: DETACH ... CONCURRENTLY нельзя выполнять в транзакции.
+    """
+
+    def __init__(self, conn: AsyncConnection):
+        self.conn = conn
+
+    async def months(self) -> list[date]:
+        result = await self.conn.execute(text("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'public.orders'::regclass
+        """))
+        months = []
+        for (name,) in result:
+            match = _PARTITION_RE.match(name)
+            if match:
+                months.append(date(int(match[1]), int(match[2]), 1))
+        return sorted(months)
+
+    async def ensure(self, first: date, months_ahead: int) -> list[str]:
+        """Создает недостающие партиции с месяца first на months_ahead месяцев вперед."""
+        # Несколько воркеров стартуют одновременно: создание партиций сериализуется
+        await self.conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('order_partitions'))"))
+        existing = set(await self.months())
+        created = []
+        month = first.replace(day=1)
+        last = add_months(month, months_ahead)
+        while month <= last:
+            if month not in existing:
+                upper = add_months(month, 1)
+                for table in PARTITIONED_TABLES:
+                    name = partition_name(table, month)
+                    await self.conn.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+                    ))
+                    created.append(name)
+            month = add_months(month, 1)
+        if created:
+            logger.info(f"Created order partitions: {', '.join(created)}")
+        return created
+
+    async def detach_month(self, month: date) -> None:
+        """
+        Отсоединяет партиции месяца без долгой блокировки и переносит их в схему archive.
+
+        Сначала отсоединяется партиция позиций и с нее снимается унаследованный
+        внешний ключ, иначе она продолжала бы ссылаться на отсоединяемые заказы.
+        """
+        await self.conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+        for table in reversed(PARTITIONED_TABLES):
+            name = partition_name(table, month)
+            await self.conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name} CONCURRENTLY"))
+            foreign_keys = await self.conn.execute(
+                text("SELECT conname FROM pg_constraint WHERE conrelid = CAST(:name AS regclass) AND contype = 'f'"),
+                {"name": name},
+            )
+            for (constraint,) in foreign_keys.all():
+                await self.conn.execute(text(f'ALTER TABLE {name} DROP CONSTRAINT "{constraint}"'))
+            await self.conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+            logger.info(f"Detached partition {name} to schema {ARCHIVE_SCHEMA}")
+
+    async def move_batch(self, table: str, key: str, cutoff, batch_size: int) -> int:
+        """
+        Переносит до batch_size строк старше cutoff в холодную таблицу archive.<table>.
+        Возвращает число перенесенных строк; транзакцией управляет вызывающий код.
+        """
+        await self.conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+        await self.conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.{table} (LIKE public.{table})"
+        ))
+        result = await self.conn.execute(
+            text(f"""
+                WITH batch AS (
+                    SELECT id, {key} FROM {table}
+                    WHERE {key} < :cutoff
+                    ORDER BY {key}
+                    LIMIT :batch_size
+                ), moved AS (
+                    DELETE FROM {table} t
+                    USING batch b
+                    WHERE t.id = b.id AND t.{key} = b.{key}
+                    RETURNING t.*
+                )
+                INSERT INTO {ARCHIVE_SCHEMA}.{table} SELECT * FROM moved
+            """),
+            {"cutoff": cutoff, "batch_size": batch_size},
+        )
+        return result.rowcount
+
+
+__all__ = [
+        'OrderPartitionManager',
+        'add_months',
+        'partition_name',
+]
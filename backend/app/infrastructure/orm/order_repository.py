@@ -1,52 +1,201 @@
-from sqlalchemy import select
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import NamedTuple
+
+from sqlalchemy import ARRAY, Integer, any_, insert, literal, select, update
 from sqlalchemy.orm import selectinload
 from app.domain.abc_repositories.order_repository import OrderRepository
 from app.infrastructure.orm.models import OrderModel, OrderItemModel
-from app.domain.models.order import Order
+from app.infrastructure.orm.analytics_repository import SqlAnalyticsRepository
+from app.domain.models.order import Order, TERMINAL_STATUSES
 from app.domain.models.orderItem import OrderItem
+from app.core.configs import settings
 
-class SqlOrderRepository(OrderRepository):
+_storage = settings.order_storage_settings
+
+
+class _StatusChange(NamedTuple):
+    id: int
+    user_id: int | None
+    status: str
+    delivery_address: str | None
+    created_at: datetime
+    total_price: Decimal
+    item_count: int
+    previous_status: str | None
 
+
+class SqlOrderRepository(OrderRepository):
     def __init__(self, db):
         self.db = db
 
     async def save(self, order):
-        if order.id:
-            stmt = select(OrderModel).where(OrderModel.id == order.id)
-            result = await self.db.execute(stmt)
-            model = result.scalar_one_or_none()
-            if model:
-                model.status = order.status
-                await self.db.commit()
-            return order.id
-
-        model = OrderModel(user_id=order.user_id, status=order.status, delivery_address=order.delivery_address)
-        self.db.add(model)
-        await self.db.flush()
-
-        for item in order.items:
-            self.db.add(OrderItemModel(
-                order_id=model.id,
-                product_id=item.product_id,
-                quantity=item.quantity,
-                price=item.price 
-            ))
-
-        await self.db.commit()
-        order.id = model.id
-        return model.id
-
-    async def get_by_user_id(self, user_id: int):
+        # Статус существующего заказа меняется через update_status
+        return (await self.save_many([order]))[0]
+
+    async def save_many(self, orders: list[Order]) -> list[int]:
+        # Быстрый путь: INSERT ... RETURNING id для заказов и один многострочный
+        # INSERT для всех позиций, без unit of work ORM. Фиксирует вызывающий код
+        result = await self.db.execute(
+            insert(OrderModel).returning(OrderModel.id, OrderModel.created_at, sort_by_parameter_order=True),
+            [
+                {
+                    "user_id": order.user_id,
+                    "status": order.status,
+                    "delivery_address": order.delivery_address,
+                    "total_price": order.total_price,
+                    "item_count": order.item_count,
+                }
+                for order in orders
+            ],
+        )
+        rows = result.all()
+
+        items = [
+            {
+                "order_id": order_id,
+                "order_created_at": created_at,
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "price": item.price,
+            }
+            for order, (order_id, created_at) in zip(orders, rows)
+            for item in order.items
+        ]
+        if items:
+            await self.db.execute(insert(OrderItemModel).values(items))
+
+        for order, (order_id, created_at) in zip(orders, rows):
+            order.id = order_id
+            order.created_at = created_at
+        await SqlAnalyticsRepository(self.db).record_orders_created(orders)
+        return [order_id for order_id, _ in rows]
+
+    async def update_status(self, order_id: int, status: str, with_items: bool = True):
+        rows = await self._set_status(status, OrderModel.id == order_id)
+        if not rows:
+            return None
+        row = rows[0]
+        await SqlAnalyticsRepository(self.db).record_status_changes(
+            [(row.id, row.created_at, row.total_price, row.previous_status, row.status)]
+        )
+
+        order = Order(
+            user_id=row.user_id,
+            id=row.id,
+            status=row.status,
+            delivery_address=row.delivery_address,
+            created_at=row.created_at,
+            # С позициями итоги пересчитает add_item
+            total_price=None if with_items else row.total_price,
+            item_count=None if with_items else row.item_count,
+        )
+        if with_items:
+            items = await self.db.execute(
+                select(OrderItemModel.product_id, OrderItemModel.price, OrderItemModel.quantity)
+                .where(OrderItemModel.order_id == order_id, OrderItemModel.order_created_at == row.created_at)
+            )
+            for item in items:
+                order.add_item(OrderItem(product_id=item.product_id, price=item.price, quantity=item.quantity))
+
+        return order
+
+    async def update_status_many(
+        self,
+        status: str,
+        order_ids: list[int] | None = None,
+        from_status: str | None = None,
+    ) -> list[tuple[int, int | None]]:
+        # Один set-based UPDATE; возвращает (id, user_id) измененных заказов
+        criteria = []
+        if order_ids is not None:
+            # В PostgreSQL список уходит одним параметром-массивом (id = ANY(:ids)):
+            # IN с тысячами параметров упрется в лимит asyncpg
+            criteria.append(
+                OrderModel.id == any_(literal(order_ids, ARRAY(Integer)))
+                if self._is_postgres
+                else OrderModel.id.in_(order_ids)
+            )
+        if from_status is not None:
+            criteria.append(OrderModel.status == from_status)
+        rows = await self._set_status(status, *criteria)
+        await SqlAnalyticsRepository(self.db).record_status_changes(
+            [(row.id, row.created_at, row.total_price, row.previous_status, row.status) for row in rows]
+        )
+        return [(row.id, row.user_id) for row in rows]
+
+    @property
+    def _is_postgres(self) -> bool:
+        return self.db.get_bind().dialect.name == "postgresql"
+
+    async def _set_status(self, status: str, *criteria):
+        """
+        Меняет статус заказов под условием и возвращает их строки вместе с
+        previous_status - статусом до изменения, он нужен сводкам продаж.
+        """
+        returning = (
+            OrderModel.id,
+            OrderModel.user_id,
+            OrderModel.status,
+            OrderModel.delivery_address,
+            OrderModel.created_at,
+            OrderModel.total_price,
+            OrderModel.item_count,
+        )
+        locked = (
+            select(OrderModel.id, OrderModel.created_at, OrderModel.status)
+            .where(*criteria)
+            .order_by(OrderModel.id)
+            .with_for_update()
+        )
+        if self._is_postgres:
+            # Один запрос: UPDATE orders ... FROM (SELECT ... FOR UPDATE) old.
+            # Подзапрос блокирует строки и видит их до изменения, поэтому
+            # old.status - прежний статус; created_at из него сводит UPDATE к нужным партициям
+            old = locked.subquery("old")
+            result = await self.db.execute(
+                update(OrderModel)
+                .where(OrderModel.id == old.c.id, OrderModel.created_at == old.c.created_at)
+                .values(status=status)
+                .returning(*returning, old.c.status.label("previous_status"))
+                .execution_options(synchronize_session=False)
+            )
+            return result.all()
+
+        # SQLite: в UPDATE ... FROM подзапрос не материализуется, и RETURNING
+        # отдал бы уже новый статус. Прежние статусы читаются отдельным запросом
+        previous = {row.id: row for row in (await self.db.execute(locked)).all()}
+        if not previous:
+            return []
+        result = await self.db.execute(
+            update(OrderModel)
+            .where(OrderModel.id.in_(list(previous)))
+            .values(status=status)
+            .returning(*returning)
+            .execution_options(synchronize_session=False)
+        )
+        return [_StatusChange(*row, previous[row.id].status) for row in result.all()]
+
+    async def get_by_user_id(self, user_id: int, created_from: datetime | None = None):
+        # Без created_from читаются все партиции: это вся история пользователя
         stmt = select(OrderModel).options(selectinload(OrderModel.items)).where(OrderModel.user_id == user_id)
+        if created_from is not None:
+            stmt = stmt.where(OrderModel.created_at >= created_from)
         result = await self.db.execute(stmt)
         models = result.scalars().all()
         return [self._to_domain(m) for m in models]
 
     async def get_by_id(self, order_id: int):
+        # По id партицию не определить: сначала горячие партиции, где лежит почти
+        # все, что читают по id, и только если заказа там нет - остальные
         stmt = select(OrderModel).options(selectinload(OrderModel.items)).where(OrderModel.id == order_id)
-        result = await self.db.execute(stmt)
-        model = result.scalar_one_or_none()
-        return self._to_domain(model) if model else None
+        hot_from = self._hot_from()
+        for bound in (OrderModel.created_at >= hot_from, OrderModel.created_at < hot_from):
+            model = (await self.db.execute(stmt.where(bound))).scalar_one_or_none()
+            if model is not None:
+                return self._to_domain(model)
+        return None
 
     async def get_all(self):
         stmt = select(OrderModel).options(selectinload(OrderModel.items)).order_by(OrderModel.id.desc())
@@ -54,8 +203,107 @@ class SqlOrderRepository(OrderRepository):
         models = result.scalars().all()
         return [self._to_domain(m) for m in models]
 
-    def _to_domain(self, model):
-        order = Order(user_id=model.user_id, id=model.id, status=model.status, delivery_address=model.delivery_address)
+    async def get_page(
+        self,
+        limit: int,
+        after_id: int | None = None,
+        user_id: int | None = None,
+        status: str | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        with_items: bool = True,
+    ):
+        # Keyset-пагинация от новых заказов к старым: after_id - последний id предыдущей страницы
+        stmt = select(OrderModel).order_by(OrderModel.id.desc())
+        if with_items:
+            stmt = stmt.options(selectinload(OrderModel.items))
+        if after_id is not None:
+            stmt = stmt.where(OrderModel.id < after_id)
+        if user_id is not None:
+            stmt = stmt.where(OrderModel.user_id == user_id)
+        if status is not None:
+            stmt = stmt.where(OrderModel.status == status)
+        if created_to is not None:
+            stmt = stmt.where(OrderModel.created_at < created_to)
+
+        # Сначала читаем только горячие партиции; к старым идем, лишь если
+        # страница не набралась. Тогда горячие строки до after_id уже прочитаны
+        # все, и слияние с холодными по id дает точную страницу, даже если порядок
+        # id и created_at расходится (created_at - время начала транзакции вставки).
+        # Допущение остается для полной горячей страницы: холодный заказ с id больше
+        # последнего на ней возможен, только если он вставлен одновременно с
+        # горячими, т.е. в пределах длительности транзакции от границы окна
+        hot_from = self._hot_from()
+        if created_from is not None and created_from >= hot_from:
+            return await self._fetch(stmt.where(OrderModel.created_at >= created_from).limit(limit), with_items)
+
+        orders = await self._fetch(stmt.where(OrderModel.created_at >= hot_from).limit(limit), with_items)
+        if len(orders) < limit:
+            cold = stmt.where(OrderModel.created_at < hot_from)
+            if created_from is not None:
+                cold = cold.where(OrderModel.created_at >= created_from)
+            orders += await self._fetch(cold.limit(limit), with_items)
+            orders.sort(key=lambda order: order.id, reverse=True)
+            del orders[limit:]
+        return orders
+
+    @staticmethod
+    def _hot_from() -> datetime:
+        return datetime.now(timezone.utc) - timedelta(days=_storage.ORDERS_HOT_WINDOW_DAYS)
+
+    async def _fetch(self, stmt, with_items: bool):
+        result = await self.db.execute(stmt)
+        return [self._to_domain(m, with_items) for m in result.scalars().all()]
+
+    async def get_active(self, order_ids: list[int] | None = None):
+        # Условие совпадает с предикатом частичного индекса ix_orders_active_status_id.
+        # Статусы подставляются литералами: с параметрами планировщик не сможет
+        # доказать, что условие покрывает индекс, в общем плане prepared statement
+        terminal = [literal(s, literal_execute=True) for s in TERMINAL_STATUSES]
+        # Незавершенные заказы старше горячего окна на экран кухни не попадают,
+        # а граница по created_at отсекает холодные партиции
+        hot_from = self._hot_from()
+        stmt = (
+            select(OrderModel)
+            .options(selectinload(OrderModel.items))
+            .where(OrderModel.status.not_in(terminal), OrderModel.created_at >= hot_from)
+            .order_by(OrderModel.id)
+        )
+        if order_ids is not None:
+            stmt = stmt.where(OrderModel.id.in_(order_ids))
+        result = await self.db.execute(stmt)
+        return [self._to_domain(m) for m in result.scalars().all()]
+
+    async def stream_all(self, batch_size: int = 500) -> AsyncIterator[Order]:
+        # Серверный курсор: в памяти одновременно держится не больше batch_size заказов
+        stmt = (
+            select(OrderModel)
+            .options(selectinload(OrderModel.items))
+            .order_by(OrderModel.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.db.stream_scalars(stmt)
+        async for model in result:
+            yield self._to_domain(model)
+
+    def _to_domain(self, model, with_items: bool = True):
+        if not with_items:
+            return Order(
+                user_id=model.user_id,
+                id=model.id,
+                status=model.status,
+                delivery_address=model.delivery_address,
+                created_at=model.created_at,
+                total_price=model.total_price,
+                item_count=model.item_count,
+            )
+        order = Order(
+            user_id=model.user_id,
+            id=model.id,
+            status=model.status,
+            delivery_address=model.delivery_address,
+            created_at=model.created_at,
+        )
         for item in model.items:
             # Предполагаем, что в модели OrderItemModel есть поле price
             order.add_item(OrderItem(product_id=item.product_id, price=item.price, quantity=item.quantity))
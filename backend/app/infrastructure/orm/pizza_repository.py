@@ -1,9 +1,11 @@
-from typing import List
-from sqlalchemy import select
+from typing import Iterable, List
+from sqlalchemy import case, func, literal, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.domain.abc_repositories.pizza_repository import IPizzaRepository
 from app.domain.models.pizza import Pizza
+from app.infrastructure.database import after_commit
 from app.infrastructure.orm.models import PizzaORM
+from app.infrastructure.search_index import product_search_index
 
 class SqlPizzaRepository(IPizzaRepository):
     def __init__(self, db: AsyncSession):
@@ -24,6 +26,25 @@ class SqlPizzaRepository(IPizzaRepository):
             ) for p in orm_pizzas
         ]
 
+    async def get_page(self, category: str | None, limit: int, after_id: int | None = None) -> List[Pizza]:
+        # Keyset-пагинация по id: обслуживается индексом (category, id)
+        stmt = select(PizzaORM).order_by(PizzaORM.id).limit(limit)
+        if category is not None:
+            stmt = stmt.where(PizzaORM.category == category)
+        if after_id is not None:
+            stmt = stmt.where(PizzaORM.id > after_id)
+        result = await self.db.execute(stmt)
+        return [
+            Pizza(
+                id=p.id,
+                name=p.name,
+                price=p.price,
+                description=p.description,
+                category=p.category,
+                image_url=p.image_url
+            ) for p in result.scalars().all()
+        ]
+
     async def get_by_id(self, pizza_id: int) -> Pizza | None:
         result = await self.db.execute(select(PizzaORM).where(PizzaORM.id == pizza_id))
         p = result.scalars().first()
@@ -38,6 +59,22 @@ class SqlPizzaRepository(IPizzaRepository):
             image_url=p.image_url
         )
 
+    async def get_many(self, pizza_ids: Iterable[int]) -> dict[int, Pizza]:
+        ids = list(set(pizza_ids))
+        if not ids:
+            return {}
+        result = await self.db.execute(select(PizzaORM).where(PizzaORM.id.in_(ids)))
+        return {
+            p.id: Pizza(
+                id=p.id,
+                name=p.name,
+                price=p.price,
+                description=p.description,
+                category=p.category,
+                image_url=p.image_url
+            ) for p in result.scalars().all()
+        }
+
     async def add(self, pizza: Pizza) -> Pizza:
         orm_pizza = PizzaORM(
             name=pizza.name,
@@ -47,8 +84,9 @@ class SqlPizzaRepository(IPizzaRepository):
             image_url=pizza.image_url
         )
         self.db.add(orm_pizza)
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(orm_pizza)
+        after_commit(self.db, product_search_index.invalidate)
         return Pizza(
             id=orm_pizza.id,
             name=orm_pizza.name,
@@ -58,8 +96,26 @@ class SqlPizzaRepository(IPizzaRepository):
             image_url=orm_pizza.image_url
         )
 
-    async def search(self, query: str) -> List[Pizza]:
-        result = await self.db.execute(select(PizzaORM).where(PizzaORM.name.ilike(f"%{query}%")))
+    async def search(self, query: str, limit: int = 20) -> List[Pizza]:
+        if self.db.get_bind().dialect.name != "postgresql":
+            if product_search_index.is_stale:
+                product_search_index.rebuild(await self.get_all())
+            return product_search_index.search(query, limit)
+
+        # Оба условия обслуживаются GIN-индексом pg_trgm по search_document
+        needle = query.strip().lower()
+        document = PizzaORM.search_document
+        rank = func.word_similarity(needle, document) + case(
+            (func.lower(PizzaORM.name).contains(needle, autoescape=True), 1),
+            else_=0,
+        )
+        stmt = (
+            select(PizzaORM)
+            .where(or_(document.contains(needle, autoescape=True), literal(needle).op("<%")(document)))
+            .order_by(rank.desc(), PizzaORM.id)
+            .limit(limit)
+        )
+        result = await self.db.execute(stmt)
         orm_pizzas = result.scalars().all()
         return [
             Pizza(
@@ -84,8 +140,9 @@ class SqlPizzaRepository(IPizzaRepository):
             orm_pizza.category = pizza.category
             orm_pizza.image_url = pizza.image_url
             
-            await self.db.commit()
+            await self.db.flush()
             await self.db.refresh(orm_pizza)
+            after_commit(self.db, product_search_index.invalidate)
             
             # Возвращаем обновленный объект (можно мапить заново, но поля те же)
             return pizza
@@ -97,6 +154,7 @@ class SqlPizzaRepository(IPizzaRepository):
         orm_pizza = result.scalars().first()
         if orm_pizza:
             await self.db.delete(orm_pizza)
-            await self.db.commit()
+            await self.db.flush()
+            after_commit(self.db, product_search_index.invalidate)
             return True
         return False
@@ -0,0 +1,82 @@
+from datetime import datetime
+
+from loguru import logger
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.domain.abc_repositories.refresh_token_repository import IRefreshTokenRepository
+from app.domain.models.refresh_token import RefreshToken
+from app.infrastructure.orm.models import RefreshTokenORM
+
+class SqlRefreshTokenRepository(IRefreshTokenRepository):
+    """
+    Refresh-токены хранятся только как sha256 от значения, поиск идет по
+    уникальному индексу token_hash. Все токены одной цепочки ротаций имеют
+    общий family_id: повторное использование уже замененного токена отзывает
+    всю цепочку.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, user_id: int, token_hash: str, family_id: str, expires_at: datetime) -> RefreshToken:
+        return await self._insert(user_id, token_hash, family_id, expires_at)
+
+    async def rotate(self, token_hash: str, new_token_hash: str, expires_at: datetime) -> RefreshToken | None:
+        # Один UPDATE ... RETURNING: из двух одновременных обменов пройдет только один
+        result = await self.db.execute(
+            update(RefreshTokenORM)
+            .where(
+                RefreshTokenORM.token_hash == token_hash,
+                RefreshTokenORM.revoked_at.is_(None),
+                RefreshTokenORM.expires_at > func.now(),
+            )
+            .values(revoked_at=func.now())
+            .returning(RefreshTokenORM.user_id, RefreshTokenORM.family_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            # Отзыв цепочки должен быть зафиксирован, хотя вызывающий код ответит ошибкой
+            await self._revoke_family_if_reused(token_hash)
+            return None
+
+        return await self._insert(row.user_id, new_token_hash, row.family_id, expires_at)
+
+    async def revoke_family(self, token_hash: str) -> None:
+        family = select(RefreshTokenORM.family_id).where(RefreshTokenORM.token_hash == token_hash).scalar_subquery()
+        await self.db.execute(
+            update(RefreshTokenORM)
+            .where(RefreshTokenORM.family_id == family, RefreshTokenORM.revoked_at.is_(None))
+            .values(revoked_at=func.now())
+        )
+
+    async def revoke_all_for_user(self, user_id: int) -> None:
+        await self.db.execute(
+            update(RefreshTokenORM)
+            .where(RefreshTokenORM.user_id == user_id, RefreshTokenORM.revoked_at.is_(None))
+            .values(revoked_at=func.now())
+        )
+
+    async def _insert(self, user_id: int, token_hash: str, family_id: str, expires_at: datetime) -> RefreshToken:
+        result = await self.db.execute(
+            insert(RefreshTokenORM)
+            .values(user_id=user_id, token_hash=token_hash, family_id=family_id, expires_at=expires_at)
+            .returning(RefreshTokenORM.id)
+        )
+        return RefreshToken(id=result.scalar_one(), user_id=user_id, family_id=family_id, expires_at=expires_at)
+
+    async def _revoke_family_if_reused(self, token_hash: str) -> None:
+        result = await self.db.execute(
+            select(RefreshTokenORM.user_id, RefreshTokenORM.family_id, RefreshTokenORM.revoked_at)
+            .where(RefreshTokenORM.token_hash == token_hash)
+        )
+        row = result.one_or_none()
+        if row is None or row.revoked_at is None:
+            # Неизвестный или просто истекший токен
+            return
+        # Отозванный токен предъявлен снова: вероятно, он украден, отзываем всю цепочку
+        logger.warning(f"Refresh token reuse detected for user {row.user_id}, revoking family {row.family_id}")
+        await self.db.execute(
+            update(RefreshTokenORM)
+            .where(RefreshTokenORM.family_id == row.family_id, RefreshTokenORM.revoked_at.is_(None))
+            .values(revoked_at=func.now())
+        )
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.domain.abc_repositories.user_repository import IUserRepository
@@ -19,7 +21,8 @@ class SqlUserRepository(IUserRepository):
             password_hash=user_orm.hashed_password,
             is_active=user_orm.is_active,
             role=user_orm.role,
-            is_verified=user_orm.is_verified
+            is_verified=user_orm.is_verified,
+            token_epoch=user_orm.token_epoch
         )
 
     async def create(self, user: User) -> User:
@@ -32,7 +35,6 @@ class SqlUserRepository(IUserRepository):
         )
         self.db.add(user_orm)
         await self.db.flush()
-        await self.db.commit()
         user.id = user_orm.id
         return user
 
@@ -47,7 +49,8 @@ class SqlUserRepository(IUserRepository):
             password_hash=user_orm.hashed_password,
             is_active=user_orm.is_active,
             role=user_orm.role,
-            is_verified=user_orm.is_verified
+            is_verified=user_orm.is_verified,
+            token_epoch=user_orm.token_epoch
         )
 
     async def count(self) -> int:
@@ -59,7 +62,25 @@ class SqlUserRepository(IUserRepository):
         result = await self.db.execute(stmt)
         user_orm = result.scalars().first()
         if user_orm:
+            if (
+                user_orm.hashed_password != user.password_hash
+                or user_orm.role != user.role
+                or user_orm.is_active != user.is_active
+            ):
+                # Новый пароль отзывает все выданные access-токены. Роль и активность
+                # get_current_user берет из claims, поэтому их смена тоже отзывает токены
+                user_orm.token_epoch += 1
+                user_orm.token_epoch_changed_at = func.now()
+                user.token_epoch = user_orm.token_epoch
             user_orm.is_verified = user.is_verified
             user_orm.hashed_password = user.password_hash
-            await self.db.commit()
-        return user
\ No newline at end of file
+            user_orm.role = user.role
+            user_orm.is_active = user.is_active
+            await self.db.flush()
+        return user
+
+    async def get_token_epochs_changed_since(self, since: datetime) -> dict[int, int]:
+        result = await self.db.execute(
+            select(UserORM.id, UserORM.token_epoch).where(UserORM.token_epoch_changed_at >= since)
+        )
+        return {row.id: row.token_epoch for row in result}
@@ -0,0 +1,89 @@
+import bisect
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Верхние границы корзин гистограммы ожидания соединения, мс
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolMetrics:
+    """
+    Счетчики пула соединений одного процесса.
+
+    Время выдачи соединения меряет InstrumentedAsyncPool вокруг _do_get: туда
+    входит ожидание свободного соединения и открытие нового. По гистограмме
+    видно, хватает ли pool_size, по timeouts и peak_in_use - max_overflow.
+    """
+
+    def __init__(self, buckets_ms: tuple[float, ...] = CHECKOUT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.reset()
+
+    def reset(self) -> None:
+        # Последняя корзина - все, что дольше самой большой границы
+        self.bucket_counts = [0] * (len(self.buckets_ms) + 1)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_sum_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.peak_in_use = 0
+
+    def record_checkout(self, wait_ms: float, in_use: int) -> None:
+        self.checkouts += 1
+        self.wait_sum_ms += wait_ms
+        self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+        self.bucket_counts[bisect.bisect_left(self.buckets_ms, wait_ms)] += 1
+        self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def record_timeout(self) -> None:
+        self.timeouts += 1
+
+    def snapshot(self, pool: "InstrumentedAsyncPool") -> dict:
+        # Накопительные корзины, как le в гистограммах Prometheus
+        cumulative, total = {}, 0
+        for bound, count in zip([*self.buckets_ms, "+Inf"], self.bucket_counts):
+            total += count
+            cumulative[str(bound)] = total
+        return {
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+            "in_use": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "peak_in_use": self.peak_in_use,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "checkout_wait_ms": {
+                "avg": round(self.wait_sum_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "max": round(self.wait_max_ms, 3),
+                "sum": round(self.wait_sum_ms, 3),
+                "buckets": cumulative,
+            },
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, который пишет время выдачи соединений в pool_metrics."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        pool_metrics.record_checkout((time.perf_counter() - started) * 1000, self.checkedout())
+        return connection
+
+
+__all__ = [
+        'InstrumentedAsyncPool',
+        'PoolMetrics',
+        'pool_metrics',
+]
@@ -0,0 +1,150 @@
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    """
+    Запросы к базе в пределах одного HTTP-запроса или блока track_queries().
+
+    Форма запроса - текст SQL с плейсхолдерами ($1, $2): одинаковый SELECT
+    с разными id дает одну форму. Если форма повторилась repeat_threshold раз,
+    это почти всегда N+1, и в лог один раз пишется предупреждение.
+    """
+
+    def __init__(self, label: str = "", repeat_threshold: int = 0):
+        self.label = label
+        self.repeat_threshold = repeat_threshold
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[statement] += 1
+        if self.repeat_threshold and self.shapes[statement] == self.repeat_threshold:
+            logger.warning(
+                f"Possible N+1 in {self.label or 'unknown context'}: statement repeated "
+                f"{self.repeat_threshold} times: {_shorten(statement)}"
+            )
+
+    def repeated(self, min_count: int = 2) -> dict[str, int]:
+        return {statement: count for statement, count in self.shapes.items() if count >= min_count}
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> QueryStats | None:
+    return _current.get()
+
+
+@contextmanager
+def track_queries(label: str = "", repeat_threshold: int = 0) -> Iterator[QueryStats]:
+    """
+    Считает запросы внутри блока, в том числе в вызванных из него корутинах:
+        with track_queries() as stats:
+            await uc.execute(...)
+        assert stats.count <= 3
+    """
+    stats = QueryStats(label, repeat_threshold)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def untracked_context() -> Context:
+    """
+    Контекст для задачи, которая переживает запрос (asyncio.create_task(..., context=...)).
+    Задача иначе унаследует QueryStats запроса и припишет ему свои запросы.
+    """
+    context = copy_context()
+    context.run(_current.set, None)
+    return context
+
+
+def install_query_hooks(engine: Engine, slow_query_ms: float) -> None:
+    """
+    Хуки курсора движка. SQLAlchemy выполняет sync-код асинхронного движка в
+    greenlet с контекстом вызывающей задачи, поэтому ContextVar запроса здесь виден.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_started"].pop()) * 1000
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, elapsed_ms)
+        if slow_query_ms and elapsed_ms >= slow_query_ms:
+            where = f" in {stats.label}" if stats is not None and stats.label else ""
+            logger.warning(f"Slow query{where} ({elapsed_ms:.1f} ms): {_shorten(statement)}")
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        # after_cursor_execute при ошибке не вызывается, время старта нужно снять
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+
+class QueryStatsMiddleware:
+    """
+    Заводит QueryStats на каждый HTTP-запрос. С expose_headers добавляет в ответ
+    X-DB-Query-Count и X-DB-Query-Time-Ms (для отладки: заголовки раскрывают
+    устройство запросов). Commit из get_uow выполняется до отправки ответа и
+    тоже учитывается; запросы во время потокового ответа в заголовки не попадают.
+    """
+
+    def __init__(self, app, repeat_threshold: int, expose_headers: bool = False):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+        self.expose_headers = expose_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(f"{scope['method']} {scope['path']}", self.repeat_threshold) as stats:
+            if not self.expose_headers:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_with_headers(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-db-query-count", str(stats.count).encode()),
+                        (b"x-db-query-time-ms", f"{stats.total_ms:.3f}".encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_with_headers)
+
+
+def _shorten(statement: str, limit: int = 300) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+__all__ = [
+        'QueryStats',
+        'QueryStatsMiddleware',
+        'current_query_stats',
+        'install_query_hooks',
+        'track_queries',
+        'untracked_context',
+]
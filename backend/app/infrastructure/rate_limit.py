@@ -0,0 +1,198 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Request, status
+from loguru import logger
+
+from app.core.configs import settings
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # Redis нужен только для RATE_LIMIT_BACKEND=redis
+    redis = None
+
+_UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    limit: int
+    window: float
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimitRule":
+        """'5/minute', '100/hour' или '20/30' (число секунд)."""
+        count, _, period = value.partition("/")
+        period = period.strip().lower()
+        window = _UNITS.get(period.rstrip("s")) or float(period)
+        return cls(limit=int(count), window=float(window))
+
+
+class RateLimitBackend(ABC):
+    """
+    Счетчики скользящего окна (sliding window counter).
+
+    Храним счетчик текущего и предыдущего фиксированного окна и взвешиваем
+    предыдущий по доле, которая еще попадает в скользящее окно. Памяти нужно
+    два числа на ключ вместо журнала всех попыток.
+    """
+
+    @abstractmethod
+    async def hit(self, key: str, rule: RateLimitRule) -> float | None:
+        """Учитывает попытку. Возвращает секунды до повтора, если лимит превышен."""
+
+    @staticmethod
+    def _estimate(previous: int, current: int, elapsed: float, rule: RateLimitRule) -> float:
+        return previous * (1 - elapsed / rule.window) + current
+
+    @staticmethod
+    def _retry_after(previous: int, current: int, elapsed: float, rule: RateLimitRule) -> float:
+        # Через сколько секунд вес предыдущего окна упадет настолько, что попытка пройдет
+        if previous == 0 or current >= rule.limit:
+            return rule.window - elapsed
+        needed = 1 - (rule.limit - current) / previous
+        return max(needed * rule.window - elapsed, 0.0)
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Счетчики в памяти процесса: при нескольких воркерах лимит действует на каждый отдельно."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # key -> (номер окна, счетчик предыдущего окна, счетчик текущего окна, когда ключ можно забыть).
+        # Порядок - от давно не использованных ключей к недавним
+        self._counters: OrderedDict[str, tuple[int, int, int, float]] = OrderedDict()
+
+    async def hit(self, key: str, rule: RateLimitRule) -> float | None:
+        now = time.time()
+        window = int(now // rule.window)
+        elapsed = now - window * rule.window
+
+        stored_window, previous, current, _ = self._counters.get(key, (window, 0, 0, 0.0))
+        if stored_window == window - 1:
+            previous, current = current, 0
+        elif stored_window != window:
+            previous, current = 0, 0
+
+        # Через два окна без попыток ключ больше ни на что не влияет
+        forget_at = (window + 2) * rule.window
+        if self._estimate(previous, current, elapsed, rule) >= rule.limit:
+            self._store(key, (window, previous, current, forget_at), now)
+            return self._retry_after(previous, current, elapsed, rule)
+
+        self._store(key, (window, previous, current + 1, forget_at), now)
+        return None
+
+    def _store(self, key: str, value: tuple[int, int, int, float], now: float) -> None:
+        self._counters[key] = value
+        self._counters.move_to_end(key)
+        # Забытые ключи снимаются с начала очереди, каждый ровно один раз. Если
+        # ключей все равно больше max_keys, вытесняются самые давние
+        while self._counters:
+            oldest_key, oldest = next(iter(self._counters.items()))
+            if oldest[3] > now and len(self._counters) <= self.max_keys:
+                break
+            del self._counters[oldest_key]
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Общие счетчики в Redis для нескольких воркеров и инстансов."""
+
+    def __init__(self, host: str, port: int, prefix: str = "rate_limit"):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package")
+        self._redis = redis.Redis(host=host, port=port)
+        self.prefix = prefix
+
+    async def hit(self, key: str, rule: RateLimitRule) -> float | None:
+        now = time.time()
+        window = int(now // rule.window)
+        elapsed = now - window * rule.window
+        current_key = f"{self.prefix}:{key}:{window}"
+        previous_key = f"{self.prefix}:{key}:{window - 1}"
+
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.incr(current_key)
+            pipe.expire(current_key, math.ceil(rule.window * 2))
+            pipe.get(previous_key)
+            current, _, previous = await pipe.execute()
+        previous = int(previous or 0)
+
+        # Счетчик уже увеличен, поэтому сравниваем состояние до этой попытки
+        if self._estimate(previous, current - 1, elapsed, rule) >= rule.limit:
+            # Отклоненная попытка не должна продлевать блокировку
+            await self._redis.decr(current_key)
+            return self._retry_after(previous, current - 1, elapsed, rule)
+        return None
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class RateLimiter:
+    """
+    Лимиты по маршрутам и ключам (ip, email и т.п.).
+
+    rules: {"login": {"ip": "20/minute", "email": "5/minute"}}. Маршрут без
+    правил не ограничивается.
+    """
+
+    def __init__(self, backend: RateLimitBackend, rules: dict[str, dict[str, str]], trust_forwarded: bool = False):
+        self.backend = backend
+        self.trust_forwarded = trust_forwarded
+        self.rules = {
+            route: {scope: RateLimitRule.parse(rule) for scope, rule in scopes.items()}
+            for route, scopes in rules.items()
+        }
+
+    def client_ip(self, request: Request) -> str:
+        if self.trust_forwarded:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.client.host if request.client else "unknown"
+
+    async def enforce(self, route: str, **keys: str | None) -> None:
+        """Проверяет все ключи маршрута, при превышении отвечает 429 с Retry-After."""
+        for scope, rule in self.rules.get(route, {}).items():
+            value = keys.get(scope)
+            if not value:
+                continue
+            retry_after = await self.backend.hit(f"{route}:{scope}:{value.lower()}", rule)
+            if retry_after is not None:
+                logger.warning(f"Rate limit exceeded for {route} by {scope}={value}")
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many attempts, try again later",
+                    headers={"Retry-After": str(max(math.ceil(retry_after), 1))},
+                )
+
+    async def close(self) -> None:
+        if isinstance(self.backend, RedisRateLimitBackend):
+            await self.backend.close()
+
+
+def _create_backend() -> RateLimitBackend:
+    if settings.rate_limit_settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitBackend(settings.redis_settings.REDIS_HOST, settings.redis_settings.REDIS_PORT)
+    return InMemoryRateLimitBackend()
+
+
+rate_limiter = RateLimiter(
+    _create_backend(),
+    settings.rate_limit_settings.RATE_LIMIT_RULES if settings.rate_limit_settings.RATE_LIMIT_ENABLED else {},
+    trust_forwarded=settings.rate_limit_settings.RATE_LIMIT_TRUST_FORWARDED,
+)
+
+
+__all__ = [
+        'InMemoryRateLimitBackend',
+        'RateLimitBackend',
+        'RateLimitRule',
+        'RateLimiter',
+        'RedisRateLimitBackend',
+        'rate_limiter',
+]
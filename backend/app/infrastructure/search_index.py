@@ -0,0 +1,72 @@
+import re
+from collections import defaultdict
+
+from app.domain.models.pizza import Pizza
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _trigrams(text: str) -> set[str]:
+    # Те же правила, что у pg_trgm: слова в нижнем регистре, дополненные пробелами
+    grams: set[str] = set()
+    for word in _WORD_RE.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class ProductSearchIndex:
+    """
+    Инвертированный триграммный индекс товаров в памяти процесса.
+
+    Используется вместо pg_trgm, когда база не PostgreSQL (SQLite в тестах).
+    Индекс перестраивается целиком при первом поиске после изменения каталога.
+    """
+
+    def __init__(self, threshold: float = 0.5):
+        self.threshold = threshold
+        self.is_stale = True
+        self._postings: dict[str, set[int]] = defaultdict(set)
+        self._products: dict[int, Pizza] = {}
+        self._documents: dict[int, str] = {}
+
+    def invalidate(self) -> None:
+        self.is_stale = True
+
+    def rebuild(self, products: list[Pizza]) -> None:
+        self._postings = defaultdict(set)
+        self._products = {p.id: p for p in products}
+        self._documents = {}
+        for p in products:
+            document = f"{p.name} {p.description or ''}".lower()
+            self._documents[p.id] = document
+            for gram in _trigrams(document):
+                self._postings[gram].add(p.id)
+        self.is_stale = False
+
+    def search(self, query: str, limit: int) -> list[Pizza]:
+        needle = query.strip().lower()
+        query_grams = _trigrams(needle)
+        if not query_grams:
+            return []
+
+        hits: dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for product_id in self._postings.get(gram, ()):
+                hits[product_id] += 1
+
+        ranked: list[tuple[float, int]] = []
+        for product_id, shared in hits.items():
+            score = shared / len(query_grams)
+            if needle in self._documents[product_id]:
+                score += 1
+            if needle in self._products[product_id].name.lower():
+                score += 1
+            if score >= self.threshold:
+                ranked.append((score, product_id))
+
+        ranked.sort(key=lambda r: (-r[0], r[1]))
+        return [self._products[product_id] for _, product_id in ranked[:limit]]
+
+
+product_search_index = ProductSearchIndex()
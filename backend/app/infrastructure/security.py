@@ -1,25 +1,92 @@
+import asyncio
+import hashlib
+import secrets
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Any
 from passlib.context import CryptContext
 from jose import jwt
 from app.core.configs import settings
+from app.core import jwt_settings
+from app.domain.models.user import User
 
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
+_hashing = settings.password_hash_settings
+_hash_executor: Executor | None = None
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def create_access_token(subject: str | Any) -> str:
+def _get_hash_executor() -> Executor | None:
+    global _hash_executor
+    if _hash_executor is None and _hashing.PASSWORD_HASH_EXECUTOR != "inline":
+        if _hashing.PASSWORD_HASH_EXECUTOR == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=_hashing.PASSWORD_HASH_WORKERS)
+        else:
+            # hashlib.pbkdf2_hmac отпускает GIL, поэтому потоков обычно достаточно
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=_hashing.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+    return _hash_executor
+
+async def _run_hashing(func, *args):
+    # pbkdf2 занимает десятки миллисекунд: в event loop это остановило бы все запросы воркера
+    executor = _get_hash_executor()
+    if executor is None:
+        return func(*args)
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hashing(get_password_hash, password)
+
+def shutdown_hash_executor() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
+
+def create_access_token(subject: str | Any, claims: dict | None = None) -> str:
     expire = datetime.now(timezone.utc) + timedelta(
         minutes=settings.jwt_settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
     )
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(
         to_encode,
         settings.jwt_settings.JWT_SECRET_KEY,
         algorithm=settings.jwt_settings.JWT_ALGORITHM
     )
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+def create_user_access_token(user: User) -> str:
+    # Роль и активность в токене: get_current_user не читает пользователя из базы
+    return create_access_token(
+        subject=user.id,
+        claims={
+            "email": user.email,
+            "role": user.role,
+            "is_active": user.is_active,
+            "is_verified": user.is_verified,
+            "epoch": user.token_epoch,
+        },
+    )
+
+def hash_refresh_token(token: str) -> str:
+    # Токен случайный и длинный, поэтому быстрого sha256 достаточно, pbkdf2 не нужен
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def create_refresh_token() -> tuple[str, str, datetime]:
+    """Возвращает (токен для клиента, его хеш для базы, срок действия)."""
+    token = secrets.token_urlsafe(32)
+    expires_at = datetime.now(timezone.utc) + timedelta(days=jwt_settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
+    return token, hash_refresh_token(token), expires_at
+
+def new_token_family() -> str:
+    return secrets.token_hex(16)
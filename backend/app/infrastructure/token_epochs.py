@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from loguru import logger
+
+from app.core.configs import settings
+from app.infrastructure.database import get_db_context
+from app.infrastructure.orm.user_repository import SqlUserRepository
+
+
+class TokenEpochRegistry:
+    """
+    Отзыв access-токенов без чтения пользователя на каждый запрос.
+
+    В токен записывается token_epoch пользователя на момент выдачи. Смена
+    пароля, роли или активности увеличивает эпоху (SqlUserRepository.update), и
+    токены со старой эпохой отклоняются. После фиксации вызовите bump(). В памяти
+    держатся только пользователи, чья эпоха менялась не раньше, чем живет
+    access-токен: более старые токены все равно уже истекли. Другие воркеры
+    узнают об отзыве при очередном обновлении, не позже refresh_interval.
+    """
+
+    def __init__(self, refresh_interval: float, window: timedelta):
+        self.refresh_interval = refresh_interval
+        self.window = window
+        self._epochs: dict[int, int] = {}
+        # Когда эпоха была поднята в этом процессе: такой записи может еще не быть в ответе базы
+        self._bumped_at: dict[int, datetime] = {}
+        self._refresher: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        await self.refresh()
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+
+    def is_revoked(self, user_id: int, epoch: int) -> bool:
+        return epoch < self._epochs.get(user_id, 0)
+
+    def bump(self, user_id: int, epoch: int) -> None:
+        # Локальный отзыв действует сразу, не дожидаясь обновления
+        if epoch > self._epochs.get(user_id, 0):
+            self._epochs[user_id] = epoch
+            self._bumped_at[user_id] = datetime.now(timezone.utc)
+
+    async def refresh(self) -> None:
+        since = datetime.now(timezone.utc) - self.window
+        async with get_db_context() as db:
+            epochs = await SqlUserRepository(db).get_token_epochs_changed_since(since)
+        # Слияние, а не замена: локальный bump мог случиться во время чтения или
+        # еще не попасть в выборку. Эпоха берется наибольшая из своей и из базы,
+        # а записи старше окна отбрасываются, как и в запросе к базе
+        merged = dict(epochs)
+        for user_id, epoch in self._epochs.items():
+            if user_id in epochs or self._bumped_at.get(user_id, since) > since:
+                merged[user_id] = max(epoch, merged.get(user_id, 0))
+        self._bumped_at = {user_id: at for user_id, at in self._bumped_at.items() if at > since}
+        self._epochs = merged
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Failed to refresh token epochs: {e}")
+
+
+_jwt = settings.jwt_settings
+
+token_epochs = TokenEpochRegistry(
+    refresh_interval=_jwt.JWT_EPOCH_REFRESH_SECONDS,
+    # Запас на расхождение часов между воркерами
+    window=timedelta(minutes=_jwt.JWT_ACCESS_TOKEN_EXPIRE_MINUTES + 5),
+)
+
+
+__all__ = [
+        'TokenEpochRegistry',
+        'token_epochs',
+]
@@ -1,11 +1,23 @@
 from contextlib import asynccontextmanager
 import sys
+from datetime import datetime, timezone
 from fastapi import FastAPI
 from loguru import logger
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api import pizzas, orders, auth
+from app.api import pizzas, orders, auth, analytics, health, metrics
 from app.core.configs import settings
+from app.infrastructure.order_events import order_event_hub
+from app.infrastructure.order_intake import order_intake
+from app.infrastructure.active_orders import active_orders
+from app.infrastructure.database import engine
+from app.infrastructure.orm.order_partitions import OrderPartitionManager
+from app.infrastructure.security import shutdown_hash_executor
+from app.infrastructure.token_epochs import token_epochs
+from app.infrastructure.rate_limit import rate_limiter
+from app.infrastructure.email_outbox import email_outbox
+from app.infrastructure.http_metrics import MetricsMiddleware, http_metrics
+from app.infrastructure.query_stats import QueryStatsMiddleware
 
 logger.remove()
 logger.add(
@@ -17,8 +29,28 @@ logger.add(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Партиции заказов на ближайшие месяцы, иначе вставка в новый месяц упадет
+    async with engine.begin() as conn:
+        await OrderPartitionManager(conn).ensure(
+            datetime.now(timezone.utc).date(),
+            settings.order_storage_settings.ORDERS_PARTITIONS_AHEAD,
+        )
+    await token_epochs.start()
+    await order_event_hub.start()
+    await active_orders.start()
+    if settings.order_intake_settings.ORDER_INTAKE_ENABLED:
+        await order_intake.start()
+    if settings.email_settings.EMAIL_OUTBOX_ENABLED:
+        await email_outbox.start()
     logger.info("Application started")
     yield
+    await email_outbox.stop()
+    await order_intake.stop()
+    await active_orders.stop()
+    await order_event_hub.stop()
+    await token_epochs.stop()
+    await rate_limiter.close()
+    shutdown_hash_executor()
 
 app = FastAPI(
     title="Pizza Delivery API",
@@ -37,8 +69,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"], # Разрешаем все методы (GET, POST, OPTIONS и т.д.)
     allow_headers=["*"], # Разрешаем все заголовки
+    expose_headers=["X-Next-Cursor", "X-DB-Query-Count", "X-DB-Query-Time-Ms"], # Курсор следующей страницы; счетчики запросов к БД в отладке
 )
+app.add_middleware(
+    QueryStatsMiddleware,
+    repeat_threshold=settings.sql_alchemy_settings.ALCHEMY_QUERY_REPEAT_THRESHOLD,
+    expose_headers=settings.sql_alchemy_settings.ALCHEMY_QUERY_HEADERS,
+)
+if settings.metrics_settings.METRICS_ENABLED:
+    # Добавлен последним, значит внешний: учитывает и ответы CORS на preflight
+    app.add_middleware(MetricsMiddleware, metrics=http_metrics)
 
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(pizzas.router, prefix="/pizzas", tags=["Pizzas"])
 app.include_router(orders.router, prefix="/orders", tags=["Orders"])
+app.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
+app.include_router(health.router, prefix="/health", tags=["Health"])
+if settings.metrics_settings.METRICS_ENABLED:
+    app.include_router(metrics.router, tags=["Metrics"])
@@ -0,0 +1,83 @@
+"""
+Архивация старых заказов.
+
+    python archive_orders.py ensure
+        создать партиции на ORDERS_PARTITIONS_AHEAD месяцев вперед
+    python archive_orders.py detach --before 2025-01
+        отсоединить помесячные партиции целиком (DETACH ... CONCURRENTLY) в схему archive
+    python archive_orders.py move --before 2025-01-15 [--batch-size 5000]
+        перенести строки старше даты в archive.orders / archive.order_items пачками,
+        каждая пачка в своей короткой транзакции
+
+Сводки продаж архивацию не замечают. Полный пересчет (rebuild_analytics.py)
+после архивации учтет только оставшиеся заказы.
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date, datetime, timezone
+
+from app.core.configs import settings
+from app.infrastructure.database import engine
+from app.infrastructure.orm.order_partitions import OrderPartitionManager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_storage = settings.order_storage_settings
+
+
+async def ensure_partitions():
+    async with engine.begin() as conn:
+        await OrderPartitionManager(conn).ensure(datetime.now(timezone.utc).date(), _storage.ORDERS_PARTITIONS_AHEAD)
+
+async def detach_partitions(before: date):
+    # DETACH ... CONCURRENTLY не работает внутри транзакции
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        partitions = OrderPartitionManager(conn)
+        months = [m for m in await partitions.months() if m < before.replace(day=1)]
+        if not months:
+            logger.info("No partitions older than %s", before)
+        for month in months:
+            logger.info("Detaching partitions for %s...", month.strftime("%Y-%m"))
+            await partitions.detach_month(month)
+
+async def move_rows(before: datetime, batch_size: int):
+    # Сначала позиции: они ссылаются на заказы внешним ключом
+    for table, key in (("order_items", "order_created_at"), ("orders", "created_at")):
+        total = 0
+        while True:
+            async with engine.begin() as conn:
+                moved = await OrderPartitionManager(conn).move_batch(table, key, before, batch_size)
+            total += moved
+            if moved < batch_size:
+                break
+        logger.info("Moved %s row(s) from %s to archive", total, table)
+
+def _parse_before(value: str) -> datetime:
+    formats = ("%Y-%m", "%Y-%m-%d")
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"Expected YYYY-MM or YYYY-MM-DD, got {value!r}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("ensure")
+    detach = commands.add_parser("detach")
+    detach.add_argument("--before", type=_parse_before, required=True)
+    move = commands.add_parser("move")
+    move.add_argument("--before", type=_parse_before, required=True)
+    move.add_argument("--batch-size", type=int, default=_storage.ORDERS_ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.command == "ensure":
+        asyncio.run(ensure_partitions())
+    elif args.command == "detach":
+        asyncio.run(detach_partitions(args.before.date()))
+    else:
+        asyncio.run(move_rows(args.before, args.batch_size))
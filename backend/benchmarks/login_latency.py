@@ -0,0 +1,85 @@
+"""
+Задержка GET /pizzas/ во время параллельных логинов.
+
+Сначала меряется задержка меню без нагрузки, затем та же выборка, пока
+несколько потоков непрерывно вызывают POST /auth/login. Запускается против
+работающего сервера; режимы хеширования сравниваются перезапуском сервера
+с PASSWORD_HASH_EXECUTOR=inline | thread | process:
+    python -m benchmarks.login_latency --email admin@example.com --password admin
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _get(url: str) -> float:
+    started = time.perf_counter()
+    with urllib.request.urlopen(url) as response:
+        response.read()
+    return (time.perf_counter() - started) * 1000
+
+
+def _login(url: str, email: str, password: str) -> None:
+    request = urllib.request.Request(
+        url,
+        data=json.dumps({"email": email, "password": password}).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+    except urllib.error.HTTPError:
+        # Неверный пароль хешируется так же долго, нагрузка та же
+        pass
+
+
+def _measure_menu(base_url: str, requests: int, concurrency: int) -> list[float]:
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(lambda _: _get(f"{base_url}/pizzas/"), range(requests)))
+
+
+def _report(name: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    print(f"{name:<12} p50={statistics.median(timings):8.2f} ms  p99={p99:8.2f} ms  max={timings[-1]:8.2f} ms")
+
+
+def main(base_url: str, email: str, password: str, requests: int, concurrency: int, logins: int) -> None:
+    # Прогрев соединений и кэша меню
+    _measure_menu(base_url, concurrency, concurrency)
+    _report("idle", _measure_menu(base_url, requests, concurrency))
+
+    stop = threading.Event()
+
+    def login_loop() -> None:
+        while not stop.is_set():
+            _login(f"{base_url}/auth/login", email, password)
+
+    threads = [threading.Thread(target=login_loop, daemon=True) for _ in range(logins)]
+    for thread in threads:
+        thread.start()
+    try:
+        time.sleep(0.5)
+        _report(f"{logins} logins", _measure_menu(base_url, requests, concurrency))
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--logins", type=int, default=8, help="number of threads logging in continuously")
+    args = parser.parse_args()
+    main(args.base_url, args.email, args.password, args.requests, args.concurrency, args.logins)
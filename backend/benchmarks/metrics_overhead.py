@@ -0,0 +1,91 @@
+"""
+Накладные расходы MetricsMiddleware на запрос.
+
+Один и тот же FastAPI-маршрут с параметром пути вызывается напрямую через
+ASGI (без сети и сервера) с middleware и без него; разница средних - цена
+учета метрик. База не нужна:
+    python -m benchmarks.metrics_overhead --requests 20000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import FastAPI
+
+from app.infrastructure.http_metrics import HttpMetrics, MetricsMiddleware
+
+
+def _make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    return app
+
+
+async def _call(app, item_id: int) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": f"/items/{item_id}",
+        "raw_path": f"/items/{item_id}".encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def _measure(app, requests: int, rounds: int) -> list[float]:
+    # Прогрев: построение стека middleware и кэшей FastAPI при первом запросе
+    for item_id in range(100):
+        await _call(app, item_id)
+    per_request = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for item_id in range(requests):
+            await _call(app, item_id)
+        per_request.append((time.perf_counter() - started) / requests * 1_000_000)
+    return per_request
+
+
+async def main(requests: int, rounds: int) -> None:
+    plain = _make_app()
+    instrumented = _make_app()
+    metrics = HttpMetrics()
+    instrumented.add_middleware(MetricsMiddleware, metrics=metrics)
+
+    plain_us = statistics.median(await _measure(plain, requests, rounds))
+    instrumented_us = statistics.median(await _measure(instrumented, requests, rounds))
+    print(f"without middleware  {plain_us:8.2f} us/request")
+    print(f"with middleware     {instrumented_us:8.2f} us/request")
+    print(f"overhead            {instrumented_us - plain_us:8.2f} us/request ({(instrumented_us / plain_us - 1) * 100:.1f}%)")
+
+    started = time.perf_counter()
+    for i in range(requests):
+        metrics.observe("GET", "/items/{item_id}", 200, i / requests)
+    print(f"observe() alone     {(time.perf_counter() - started) / requests * 1_000_000:8.2f} us/call")
+    print(f"series recorded     {len(metrics.requests)} (route template, not raw path)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rounds))
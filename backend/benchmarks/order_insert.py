@@ -0,0 +1,99 @@
+"""
+Сравнение задержки записи заказа: ORM unit of work против INSERT ... RETURNING.
+
+Запуск из каталога backend (нужна база из .env):
+    python -m benchmarks.order_insert --runs 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from decimal import Decimal
+
+from sqlalchemy import delete, select
+
+from app.domain.models.order import Order
+from app.domain.models.orderItem import OrderItem
+from app.infrastructure.database import async_session_maker
+from app.infrastructure.orm.analytics_repository import SqlAnalyticsRepository
+from app.infrastructure.orm.models import OrderItemModel, OrderModel
+from app.infrastructure.orm.order_repository import SqlOrderRepository
+
+CART_SIZES = (1, 10, 50)
+BENCH_ADDRESS = "benchmark"
+
+
+def _make_order(items: int) -> Order:
+    order = Order(user_id=None, delivery_address=BENCH_ADDRESS)
+    for i in range(items):
+        order.add_item(OrderItem(product_id=i + 1, price=Decimal("9.99"), quantity=1))
+    return order
+
+
+async def _save_orm(db, order: Order) -> int:
+    # Прежняя реализация SqlOrderRepository.save
+    model = OrderModel(user_id=order.user_id, status=order.status, delivery_address=order.delivery_address)
+    db.add(model)
+    await db.flush()
+    for item in order.items:
+        db.add(OrderItemModel(
+            order_id=model.id,
+            order_created_at=model.created_at,
+            product_id=item.product_id,
+            quantity=item.quantity,
+            price=item.price
+        ))
+    await db.commit()
+    return model.id
+
+
+async def _save_core(db, order: Order) -> int:
+    order_id = await SqlOrderRepository(db).save(order)
+    await db.commit()
+    return order_id
+
+
+async def _measure(save, items: int, runs: int) -> list[float]:
+    timings = []
+    async with async_session_maker() as db:
+        for _ in range(runs):
+            order = _make_order(items)
+            started = time.perf_counter()
+            await save(db, order)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def _cleanup() -> None:
+    async with async_session_maker() as db:
+        bench_ids = select(OrderModel.id).where(OrderModel.delivery_address == BENCH_ADDRESS)
+        await db.execute(delete(OrderItemModel).where(OrderItemModel.order_id.in_(bench_ids)))
+        await db.execute(delete(OrderModel).where(OrderModel.delivery_address == BENCH_ADDRESS))
+        # Тестовые заказы попали в сводки продаж: пересчитываем их без них
+        await SqlAnalyticsRepository(db).rebuild()
+        await db.commit()
+
+
+def _report(name: str, items: int, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<6} items={items:<3} mean={statistics.mean(timings):7.2f} ms  p50={statistics.median(timings):7.2f} ms  p95={p95:7.2f} ms")
+
+
+async def main(runs: int) -> None:
+    try:
+        for items in CART_SIZES:
+            # Прогрев пула соединений и кэша подготовленных выражений
+            await _measure(_save_orm, items, 5)
+            await _measure(_save_core, items, 5)
+            _report("orm", items, await _measure(_save_orm, items, runs))
+            _report("core", items, await _measure(_save_core, items, runs))
+    finally:
+        await _cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.runs))
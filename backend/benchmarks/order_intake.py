@@ -0,0 +1,88 @@
+"""
+Пропускная способность записи заказов под конкурентной нагрузкой:
+отдельная сессия и транзакция на каждый заказ против групповой записи OrderIntakeQueue.
+
+Запуск из каталога backend (нужна база из .env):
+    python -m benchmarks.order_intake --orders 2000 --concurrency 100
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.domain.models.order import Order
+from app.infrastructure.database import async_session_maker
+from app.infrastructure.order_intake import OrderIntakeQueue
+from app.infrastructure.orm.order_repository import SqlOrderRepository
+from app.infrastructure.orm.pizza_repository import SqlPizzaRepository
+from benchmarks.order_insert import _cleanup, _make_order
+
+CART_ITEMS = 3
+
+
+async def _save_direct(order: Order) -> int:
+    # Как в запросе без очереди: чтение товаров, своя сессия и свой commit на каждый заказ
+    async with async_session_maker() as db:
+        await SqlPizzaRepository(db).get_many(item.product_id for item in order.items)
+        order_id = await SqlOrderRepository(db).save(order)
+        await db.commit()
+        return order_id
+
+
+def _save_intake(intake: OrderIntakeQueue):
+    async def save(order: Order) -> int:
+        # Как CreateOrderUseCase: товары читаются в сессии запроса, которая
+        # закрывается до ожидания очереди
+        async with async_session_maker() as db:
+            await SqlPizzaRepository(db).get_many(item.product_id for item in order.items)
+        return await intake.submit(order)
+    return save
+
+
+async def _run(save, orders: int, concurrency: int) -> tuple[float, list[float]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    timings: list[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            order = _make_order(CART_ITEMS)
+            started = time.perf_counter()
+            await save(order)
+            timings.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(orders)))
+    return time.perf_counter() - started, timings
+
+
+def _report(name: str, elapsed: float, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    print(
+        f"{name:<7} {len(timings) / elapsed:8.1f} orders/s  "
+        f"p50={statistics.median(timings):7.2f} ms  p99={p99:7.2f} ms"
+    )
+
+
+async def main(orders: int, concurrency: int, max_batch: int, max_delay_ms: int) -> None:
+    intake = OrderIntakeQueue(max_batch=max_batch, max_delay=max_delay_ms / 1000, queue_size=concurrency * 2)
+    await intake.start()
+    try:
+        # Прогрев пула соединений
+        await _run(_save_direct, concurrency, concurrency)
+        await _run(_save_intake(intake), concurrency, concurrency)
+        _report("direct", *await _run(_save_direct, orders, concurrency))
+        _report("intake", *await _run(_save_intake(intake), orders, concurrency))
+    finally:
+        await intake.stop()
+        await _cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--max-batch", type=int, default=50)
+    parser.add_argument("--max-delay-ms", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.orders, args.concurrency, args.max_batch, args.max_delay_ms))
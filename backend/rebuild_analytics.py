@@ -0,0 +1,19 @@
+import asyncio
+import logging
+
+from app.infrastructure.database import async_session_maker
+from app.infrastructure.orm.analytics_repository import SqlAnalyticsRepository
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def rebuild_analytics():
+    async with async_session_maker() as session:
+        # Пересчет в одной транзакции: отчеты не увидят пустые сводки
+        logger.info("Rebuilding sales rollups from order_items...")
+        await SqlAnalyticsRepository(session).rebuild()
+        await session.commit()
+        logger.info("Sales rollups rebuilt.")
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_analytics())
@@ -0,0 +1,80 @@
+import os
+
+# Настройки читаются при импорте app.core.configs, поэтому окружение задается до импорта приложения
+os.environ.setdefault("POSTGRES_HOST", "localhost")
+os.environ.setdefault("POSTGRES_PORT", "5432")
+os.environ.setdefault("POSTGRES_USER", "test")
+os.environ.setdefault("POSTGRES_PASSWORD", "test")
+os.environ.setdefault("POSTGRES_DB", "test")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+# Число запросов проверяется по заголовкам X-DB-Query-Count
+os.environ.setdefault("ALCHEMY_QUERY_HEADERS", "true")
+
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.infrastructure.database import Base, async_session_maker
+from app.infrastructure.menu_cache import menu_cache
+from app.infrastructure.orm.models import PizzaORM, UserORM
+from app.infrastructure.pool_metrics import InstrumentedAsyncPool
+from app.infrastructure.query_stats import install_query_hooks
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db_engine(tmp_path):
+    """
+    SQLite вместо PostgreSQL: файл, а не :memory:, чтобы все соединения пула
+    видели одну базу. Движок устроен как в приложении: пул с метриками и
+    счетчики запросов. Общая фабрика сессий приложения на время теста
+    привязывается к этому движку.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", poolclass=InstrumentedAsyncPool)
+    install_query_hooks(engine.sync_engine, slow_query_ms=0)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    previous = async_session_maker.kw["bind"]
+    async_session_maker.configure(bind=engine)
+    try:
+        yield engine
+    finally:
+        async_session_maker.configure(bind=previous)
+        await engine.dispose()
+
+
+@pytest.fixture
+async def seeded(db_engine):
+    """Пользователь и несколько товаров меню; возвращает id пользователя и товаров."""
+    async with db_engine.begin() as conn:
+        user_id = (await conn.execute(
+            insert(UserORM).values(email="user@example.com", hashed_password="", role="employee", is_verified=True).returning(UserORM.id)
+        )).scalar_one()
+        product_ids = (await conn.execute(
+            insert(PizzaORM).returning(PizzaORM.id, sort_by_parameter_order=True),
+            [
+                {"name": f"Pizza {n}", "price": Decimal("10.00") + n, "description": "", "category": "pizza"}
+                for n in range(5)
+            ],
+        )).scalars().all()
+    return user_id, product_ids
+
+
+@pytest.fixture
+async def client(db_engine):
+    """
+    HTTP-клиент к приложению без lifespan: фоновые задачи не запускаются,
+    а кэш меню сбрасывается, чтобы тесты не видели данные друг друга.
+    """
+    from app.main import app
+
+    menu_cache.clear()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield http
@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from app.domain.models.order import Order
+from app.infrastructure.active_orders import ActiveOrdersProjection
+from app.infrastructure.orm.order_repository import SqlOrderRepository
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_changes_during_rebuild_are_not_lost(db_engine, monkeypatch):
+    loaded = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_get_active(self):
+        # Снимок базы сделан до изменений, которые придут во время ожидания
+        loaded.set()
+        await release.wait()
+        return [Order(1, id=1), Order(1, id=2)]
+
+    monkeypatch.setattr(SqlOrderRepository, "get_active", slow_get_active)
+    projection = ActiveOrdersProjection()
+    rebuild = asyncio.create_task(projection.rebuild())
+    await loaded.wait()
+
+    projection.apply(Order(1, id=3))
+    assert projection.apply_status([2], "delivered") == []
+    assert projection.apply_status([1], "cooking") == [1]
+    release.set()
+    await rebuild
+
+    assert [(order.id, order.status) for order in projection.snapshot()] == [(1, "cooking"), (3, "pending")]
@@ -0,0 +1,180 @@
+import asyncio
+import socket
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import select
+
+from app.core.configs import EmailSettings
+from app.domain.models.outbox_email import OutboxEmail
+from app.infrastructure.database import async_session_maker
+from app.infrastructure.email_outbox import EmailOutboxWorker, SmtpConnection
+from app.infrastructure.orm.email_outbox_repository import SqlEmailOutboxRepository
+from app.infrastructure.orm.models import EmailOutboxORM
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingHandler:
+    """Локальный SMTP-сервер: запоминает письма и соединения, по адресу получателя отвечает ошибкой."""
+
+    REPLIES = {
+        "busy@example.com": "450 Mailbox busy",
+        "unknown@example.com": "550 No such user",
+    }
+
+    def __init__(self):
+        self.messages: list[tuple[str, bytes]] = []
+        self.sessions: set[int] = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.REPLIES:
+            return self.REPLIES[address]
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        self.messages.append((envelope.rcpt_tos[0], envelope.content))
+        return "250 Message accepted"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    try:
+        yield handler, controller.port
+    finally:
+        controller.stop()
+
+
+def make_worker(port: int, batch_size: int = 10, max_attempts: int = 3) -> EmailOutboxWorker:
+    config = EmailSettings(
+        MAIL_USERNAME="",
+        MAIL_PASSWORD="",
+        MAIL_SERVER="127.0.0.1",
+        MAIL_PORT=port,
+        MAIL_STARTTLS=False,
+        MAIL_TIMEOUT_SECONDS=5,
+    )
+    return EmailOutboxWorker(
+        SmtpConnection(config),
+        sender="no-reply@example.com",
+        batch_size=batch_size,
+        poll_interval=0.05,
+        max_attempts=max_attempts,
+        backoff=10,
+        backoff_max=60,
+    )
+
+
+async def enqueue(*recipients: str) -> None:
+    async with async_session_maker() as db:
+        repo = SqlEmailOutboxRepository(db)
+        for recipient in recipients:
+            await repo.enqueue(OutboxEmail(recipient=recipient, subject="Hello", body="<p>Hi</p>"))
+        await db.commit()
+
+
+async def outbox_rows() -> dict[str, EmailOutboxORM]:
+    async with async_session_maker() as db:
+        rows = (await db.execute(select(EmailOutboxORM))).scalars().all()
+    return {row.recipient: row for row in rows}
+
+
+async def test_batch_is_sent_over_one_connection(db_engine, smtp_server):
+    handler, port = smtp_server
+    await enqueue("a@example.com", "b@example.com", "c@example.com")
+    worker = make_worker(port)
+    try:
+        assert await worker.process_batch() == 3
+    finally:
+        await worker.stop()
+
+    assert sorted(recipient for recipient, _ in handler.messages) == ["a@example.com", "b@example.com", "c@example.com"]
+    assert len(handler.sessions) == 1
+    rows = await outbox_rows()
+    assert {row.status for row in rows.values()} == {"sent"}
+    assert all(row.sent_at is not None for row in rows.values())
+
+
+async def test_temporary_and_permanent_rejections(db_engine, smtp_server):
+    handler, port = smtp_server
+    await enqueue("busy@example.com", "unknown@example.com", "ok@example.com")
+    worker = make_worker(port)
+    try:
+        await worker.process_batch()
+    finally:
+        await worker.stop()
+
+    assert [recipient for recipient, _ in handler.messages] == ["ok@example.com"]
+    rows = await outbox_rows()
+    assert rows["ok@example.com"].status == "sent"
+    assert rows["unknown@example.com"].status == "failed"
+    assert rows["unknown@example.com"].last_error.startswith("550")
+
+    busy = rows["busy@example.com"]
+    assert busy.status == "pending"
+    assert busy.attempts == 1
+    assert busy.last_error.startswith("450")
+    assert busy.next_attempt_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc) + timedelta(seconds=5)
+
+
+async def test_unreachable_server_postpones_the_batch(db_engine):
+    await enqueue("a@example.com", "b@example.com")
+    # Порт, на котором никто не слушает
+    worker = make_worker(free_port(), max_attempts=2)
+    try:
+        assert await worker.process_batch() == 2
+        # Отложенные письма не берутся повторно до истечения задержки
+        assert await worker.process_batch() == 0
+    finally:
+        await worker.stop()
+
+    rows = await outbox_rows()
+    assert {(row.status, row.attempts) for row in rows.values()} == {("pending", 1)}
+
+
+async def test_claimed_emails_are_leased(db_engine, smtp_server):
+    _, port = smtp_server
+    await enqueue("a@example.com")
+    now = datetime.now(timezone.utc)
+    async with async_session_maker() as db:
+        claimed = await SqlEmailOutboxRepository(db).claim_due(10, now, now + timedelta(minutes=5))
+        await db.commit()
+    assert [email.recipient for email in claimed] == ["a@example.com"]
+
+    # Пока аренда не истекла, другой воркер это письмо не возьмет
+    worker = make_worker(port)
+    try:
+        assert await worker.process_batch() == 0
+    finally:
+        await worker.stop()
+
+
+async def test_worker_is_woken_after_enqueue(db_engine, smtp_server):
+    handler, port = smtp_server
+    worker = make_worker(port)
+    worker.poll_interval = 60
+    await worker.start()
+    try:
+        await asyncio.sleep(0.05)
+        await enqueue("a@example.com")
+        worker.wake()
+        for _ in range(100):
+            if handler.messages:
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        await worker.stop()
+
+    assert [recipient for recipient, _ in handler.messages] == ["a@example.com"]
@@ -0,0 +1,48 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.domain.models.order import Order
+from app.domain.models.orderItem import OrderItem
+from app.infrastructure.database import async_session_maker
+from app.infrastructure.order_intake import OrderIntakeQueue
+from app.infrastructure.orm.models import OrderModel
+
+pytestmark = pytest.mark.anyio
+
+
+def new_order(user_id: int, product_id: int) -> Order:
+    order = Order(user_id, delivery_address="Main st. 1")
+    order.add_item(OrderItem(product_id=product_id, price=Decimal("10.00"), quantity=1))
+    return order
+
+
+async def stored_orders() -> int:
+    async with async_session_maker() as db:
+        return (await db.execute(select(func.count()).select_from(OrderModel))).scalar_one()
+
+
+async def test_orders_are_written_in_batches(seeded):
+    user_id, product_ids = seeded
+    intake = OrderIntakeQueue(max_batch=10, max_delay=0.05, queue_size=100)
+    await intake.start()
+    try:
+        order_ids = await asyncio.gather(*(intake.submit(new_order(user_id, product_ids[0])) for _ in range(3)))
+    finally:
+        await intake.stop()
+    assert len(set(order_ids)) == 3
+    assert await stored_orders() == 3
+
+
+@pytest.mark.parametrize("started", [False, True])
+async def test_submit_without_writer_writes_directly(seeded, started):
+    user_id, product_ids = seeded
+    intake = OrderIntakeQueue(max_batch=10, max_delay=0.05, queue_size=100)
+    if started:
+        await intake.start()
+        await intake.stop()
+    order_id = await asyncio.wait_for(intake.submit(new_order(user_id, product_ids[0])), 5)
+    assert order_id is not None
+    assert await stored_orders() == 1
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.configs import settings
+from app.infrastructure.database import async_session_maker
+from app.infrastructure.orm.models import OrderModel
+from app.infrastructure.orm.order_repository import SqlOrderRepository
+
+pytestmark = pytest.mark.anyio
+
+
+async def insert_orders(db_engine, ages_in_days: dict[int, int]) -> None:
+    """Заказы с заданными id и возрастом; старше окна горячих партиций - холодные."""
+    now = datetime.now(timezone.utc)
+    async with db_engine.begin() as conn:
+        await conn.execute(insert(OrderModel), [
+            {"id": order_id, "status": "delivered", "created_at": now - timedelta(days=age), "total_price": 0}
+            for order_id, age in ages_in_days.items()
+        ])
+
+
+async def page_ids(limit: int, after_id: int | None = None) -> list[int]:
+    async with async_session_maker() as db:
+        orders = await SqlOrderRepository(db).get_page(limit, after_id=after_id, with_items=False)
+    return [order.id for order in orders]
+
+
+async def test_pages_cross_the_hot_window_boundary(db_engine):
+    cold = settings.order_storage_settings.ORDERS_HOT_WINDOW_DAYS + 10
+    await insert_orders(db_engine, {1: cold + 1, 2: cold, 3: 2, 4: 1, 5: 0})
+
+    assert await page_ids(2) == [5, 4]
+    assert await page_ids(2, after_id=4) == [3, 2]
+    assert await page_ids(2, after_id=2) == [1]
+
+
+async def test_short_hot_page_is_merged_with_cold_orders_by_id(db_engine):
+    # id холодного заказа больше горячих: порядок id и created_at разошелся
+    cold = settings.order_storage_settings.ORDERS_HOT_WINDOW_DAYS + 10
+    await insert_orders(db_engine, {10: cold, 1: 1, 2: 0, 3: 0})
+
+    assert await page_ids(5) == [10, 3, 2, 1]
+
+
+async def test_get_by_id_falls_back_to_cold_partitions(db_engine):
+    cold = settings.order_storage_settings.ORDERS_HOT_WINDOW_DAYS + 10
+    await insert_orders(db_engine, {1: cold, 2: 0})
+
+    async with async_session_maker() as db:
+        repo = SqlOrderRepository(db)
+        assert (await repo.get_by_id(1)).id == 1
+        assert (await repo.get_by_id(2)).id == 2
+        assert await repo.get_by_id(3) is None
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import select
+
+from app.infrastructure.database import async_session_maker
+from app.infrastructure.orm.analytics_repository import SqlAnalyticsRepository
+from app.infrastructure.orm.models import DailySalesORM, OrderModel, ProductSalesORM
+from test.test_pool_checkouts import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+
+async def rollups() -> tuple[set, set]:
+    """Ненулевые строки сводок: после переноса между статусами остаются строки с нулями."""
+    async with async_session_maker() as db:
+        daily = (await db.execute(select(DailySalesORM.day, DailySalesORM.status, DailySalesORM.order_count, DailySalesORM.revenue))).all()
+        products = (await db.execute(select(ProductSalesORM.day, ProductSalesORM.product_id, ProductSalesORM.quantity, ProductSalesORM.revenue))).all()
+    return {tuple(r) for r in daily if r.order_count}, {tuple(r) for r in products if r.quantity}
+
+
+async def rebuilt_rollups() -> tuple[set, set]:
+    async with async_session_maker() as db:
+        await SqlAnalyticsRepository(db).rebuild()
+        await db.commit()
+    return await rollups()
+
+
+async def create_orders(client, user_id: int, product_ids: list[int], count: int) -> list[int]:
+    order_ids = []
+    for n in range(count):
+        body = {
+            "items": [{"product_id": product_id, "quantity": n + 1} for product_id in product_ids[: n + 1]],
+            "delivery_address": "Main st. 1",
+        }
+        response = await client.post("/orders/create", json=body, headers=auth_headers(user_id))
+        order_ids.append(response.json()["order_id"])
+    return order_ids
+
+
+async def test_single_status_change_keeps_rollups_consistent(client, seeded):
+    user_id, product_ids = seeded
+    admin = auth_headers(user_id, role="admin")
+    order_ids = await create_orders(client, user_id, product_ids, 3)
+
+    for order_id, status in [(order_ids[0], "delivering"), (order_ids[1], "cancelled"), (order_ids[1], "pending")]:
+        response = await client.patch(f"/orders/{order_id}/status", json={"status": status}, headers=admin)
+        assert response.status_code == 200, response.text
+        assert response.json()["status"] == status
+        assert len(response.json()["items"]) == order_ids.index(order_id) + 1
+
+    assert await rollups() == await rebuilt_rollups()
+
+
+async def test_bulk_status_change_keeps_rollups_consistent(client, seeded):
+    user_id, product_ids = seeded
+    admin = auth_headers(user_id, role="admin")
+    order_ids = await create_orders(client, user_id, product_ids, 4)
+
+    response = await client.patch("/orders/status", json={"status": "cancelled", "order_ids": order_ids[:3] + [10_000]}, headers=admin)
+    assert response.json() == {"updated": order_ids[:3], "rejected": [10_000]}
+    response = await client.patch("/orders/status", json={"status": "delivered", "from_status": "cancelled"}, headers=admin)
+    assert response.json() == {"updated": order_ids[:3], "rejected": []}
+
+    async with async_session_maker() as db:
+        statuses = dict((await db.execute(select(OrderModel.id, OrderModel.status))).all())
+    assert statuses == {**dict.fromkeys(order_ids[:3], "delivered"), order_ids[3]: "pending"}
+    assert await rollups() == await rebuilt_rollups()
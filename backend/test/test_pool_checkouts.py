@@ -0,0 +1,47 @@
+import pytest
+
+from app.domain.models.user import User
+from app.infrastructure.pool_metrics import pool_metrics
+from app.infrastructure.security import create_user_access_token
+
+pytestmark = pytest.mark.anyio
+
+
+def auth_headers(user_id: int, role: str = "employee") -> dict[str, str]:
+    user = User(id=user_id, email="user@example.com", password_hash="", role=role, is_verified=True)
+    return {"Authorization": f"Bearer {create_user_access_token(user)}"}
+
+
+async def checkouts(request) -> int:
+    """Число соединений, взятых из пула за время запроса."""
+    pool_metrics.reset()
+    response = await request
+    assert response.status_code == 200, response.text
+    return pool_metrics.checkouts
+
+
+async def test_claims_only_auth_does_not_touch_the_pool(client, seeded):
+    user_id, _ = seeded
+    assert await checkouts(client.get("/auth/me", headers=auth_headers(user_id))) == 0
+
+
+async def test_menu_cache_hit_does_not_touch_the_pool(client, seeded):
+    assert await checkouts(client.get("/pizzas/")) == 1
+    assert await checkouts(client.get("/pizzas/")) == 0
+
+
+async def test_order_create_uses_one_connection(client, seeded):
+    user_id, product_ids = seeded
+    body = {
+        "items": [{"product_id": product_id, "quantity": 2} for product_id in product_ids[:3]],
+        "delivery_address": "Main st. 1",
+    }
+    assert await checkouts(client.post("/orders/create", json=body, headers=auth_headers(user_id))) == 1
+
+
+async def test_order_list_uses_one_connection(client, seeded):
+    user_id, product_ids = seeded
+    body = {"items": [{"product_id": product_ids[0], "quantity": 1}], "delivery_address": "Main st. 1"}
+    for _ in range(3):
+        await client.post("/orders/create", json=body, headers=auth_headers(user_id))
+    assert await checkouts(client.get("/orders/", headers=auth_headers(user_id))) == 1
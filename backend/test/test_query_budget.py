@@ -0,0 +1,59 @@
+import pytest
+
+from app.infrastructure.menu_cache import MenuCache, _load_menu_page
+from app.infrastructure.query_stats import track_queries
+from test.test_pool_checkouts import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+# Число запросов не зависит от числа позиций и заказов: рост с размером данных - это N+1
+# Создание: товары, заказ, позиции, две сводки продаж
+ORDER_CREATE_QUERIES = 5
+# Список: горячие партиции, их позиции, холодные партиции (горячая страница неполная)
+ORDER_LIST_QUERIES = 3
+MENU_PAGE_QUERIES = 1
+
+
+def query_count(response) -> int:
+    assert response.status_code == 200, response.text
+    return int(response.headers["x-db-query-count"])
+
+
+async def create_order(client, user_id: int, product_ids: list[int]):
+    body = {
+        "items": [{"product_id": product_id, "quantity": 1} for product_id in product_ids],
+        "delivery_address": "Main st. 1",
+    }
+    return await client.post("/orders/create", json=body, headers=auth_headers(user_id))
+
+
+async def test_order_create_queries(client, seeded):
+    user_id, product_ids = seeded
+    assert query_count(await create_order(client, user_id, product_ids[:1])) == ORDER_CREATE_QUERIES
+    assert query_count(await create_order(client, user_id, product_ids)) == ORDER_CREATE_QUERIES
+
+
+async def test_order_list_queries(client, seeded):
+    user_id, product_ids = seeded
+    for _ in range(5):
+        await create_order(client, user_id, product_ids)
+    assert query_count(await client.get("/orders/", headers=auth_headers(user_id))) == ORDER_LIST_QUERIES
+
+
+async def test_menu_list_queries(client, seeded):
+    assert query_count(await client.get("/pizzas/")) == MENU_PAGE_QUERIES
+    assert query_count(await client.get("/pizzas/")) == 0
+
+
+async def test_background_refresh_is_not_charged_to_the_request(db_engine, seeded):
+    cache = MenuCache(_load_menu_page, ttl=60)
+    key = (None, 100, None)
+    await cache.get(*key)
+    cache.invalidate()
+
+    with track_queries() as stats:
+        # Устаревший снимок отдается сразу, перезагрузка идет в фоне
+        await cache.get(*key)
+        await cache._refresh_tasks[key]
+    assert stats.count == 0
+    assert cache._entries[key].version == cache.version
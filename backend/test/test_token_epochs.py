@@ -0,0 +1,43 @@
+import pytest
+
+from app.infrastructure.database import async_session_maker
+from app.infrastructure.orm.user_repository import SqlUserRepository
+from app.infrastructure.token_epochs import token_epochs
+from test.test_pool_checkouts import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def local_epochs(monkeypatch):
+    # Реестр общий для процесса: отзывы из теста не должны достаться другим тестам
+    monkeypatch.setattr(token_epochs, "_epochs", {})
+    monkeypatch.setattr(token_epochs, "_bumped_at", {})
+
+
+async def change_user(user_id: int, **changes) -> int:
+    async with async_session_maker() as db:
+        repo = SqlUserRepository(db)
+        user = await repo.get_by_id(user_id)
+        for name, value in changes.items():
+            setattr(user, name, value)
+        await repo.update(user)
+        await db.commit()
+    token_epochs.bump(user.id, user.token_epoch)
+    return user.token_epoch
+
+
+@pytest.mark.parametrize("changes", [{"role": "admin"}, {"is_active": False}])
+async def test_role_or_activity_change_revokes_access_tokens(client, seeded, changes):
+    user_id, _ = seeded
+    headers = auth_headers(user_id)
+    assert (await client.get("/auth/me", headers=headers)).status_code == 200
+
+    assert await change_user(user_id, **changes) == 1
+    assert (await client.get("/auth/me", headers=headers)).status_code == 401
+
+
+async def test_verification_change_keeps_access_tokens(client, seeded):
+    user_id, _ = seeded
+    assert await change_user(user_id, is_verified=False) == 0
+    assert (await client.get("/auth/me", headers=auth_headers(user_id))).status_code == 200
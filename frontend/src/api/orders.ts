@@ -5,11 +5,21 @@ export const createOrder = async (data: CreateOrderData): Promise<void> => {
   await api.post('/orders/create', data);
 };
 
+// Бэкенд отдает заказы страницами, курсор следующей страницы приходит в X-Next-Cursor
+const ORDERS_PAGE_SIZE = 200;
+
 export const getOrders = async (): Promise<Order[]> => {
-  // Примечание: этот эндпоинт в текущей реализации бэкенда возвращает заказы только для текущего пользователя.
-  // Чтобы администратор видел все заказы, требуется доработка бэкенда.
-  const response = await api.get<Order[]>('/orders/');
-  return response.data;
+  // Сотрудники и админы получают все заказы, остальные пользователи - только свои
+  const orders: Order[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await api.get<Order[]>('/orders/', {
+      params: { limit: ORDERS_PAGE_SIZE, ...(cursor ? { after_id: cursor } : {}) }
+    });
+    orders.push(...response.data);
+    cursor = response.headers['x-next-cursor'] as string | undefined;
+  } while (cursor);
+  return orders;
 };
 
 export const updateOrderStatus = async (orderId: number, data: OrderStatusUpdateData): Promise<Order> => {
@@ -1,11 +1,20 @@
 import { api } from './client';
 import type { Pizza, CreatePizzaData } from '../types';
 
+// Бэкенд отдает меню страницами, курсор следующей страницы приходит в X-Next-Cursor
+const MENU_PAGE_SIZE = 500;
+
 export const getPizzas = async (category?: string): Promise<Pizza[]> => {
-  const response = await api.get<Pizza[]>('/pizzas/', {
-    params: category ? { category } : {}
-  });
-  return response.data;
+  const pizzas: Pizza[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await api.get<Pizza[]>('/pizzas/', {
+      params: { ...(category ? { category } : {}), limit: MENU_PAGE_SIZE, ...(cursor ? { cursor } : {}) }
+    });
+    pizzas.push(...response.data);
+    cursor = response.headers['x-next-cursor'] as string | undefined;
+  } while (cursor);
+  return pizzas;
 };
 
 export const searchPizzas = async (query: string): Promise<Pizza[]> => {